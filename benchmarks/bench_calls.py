@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_calls.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from functions import call_names  # noqa: E402
+from string_utils import remove_string_literals  # noqa: E402
+
+
+BODY_LINES = 500
+
+
+def legacy_call_excs(text, fun_dict):
+    """
+    Call detection as it was done before indexing: every known function is
+    tested against every line.
+
+    Args:
+        text (str): Python code as a string.
+        fun_dict (dict): Dictionary of functions.
+
+    Returns:
+        dict: Exceptions raised by the calls in the text.
+    """
+    excs = {}
+    for line_idx, line in enumerate(text.split("\n")):
+        clean_line = remove_string_literals(f"{line}\n")
+        excs.update({exc: line_idx
+                     for funct_call
+                     in (fun_excs
+                         for fun_name, fun_excs
+                         in fun_dict.items()
+                         if f"{fun_name}(" in clean_line
+                         and f"def {fun_name}" not in clean_line)
+                     for exc, _
+                     in funct_call})
+    return excs
+
+
+def indexed_call_excs(text, fun_dict):
+    """
+    Call detection as done by exceptions.raised_exceptions: the names called
+    in each line are looked up in fun_dict.
+
+    Args:
+        text (str): Python code as a string.
+        fun_dict (dict): Dictionary of functions.
+
+    Returns:
+        dict: Exceptions raised by the calls in the text.
+    """
+    excs = {}
+    for line_idx, line in enumerate(text.split("\n")):
+        clean_line = remove_string_literals(f"{line}\n")
+        excs.update({exc: line_idx
+                     for fun_name
+                     in call_names(clean_line)
+                     if fun_name in fun_dict
+                     for exc, _
+                     in fun_dict[fun_name]})
+    return excs
+
+
+def synthetic_input(n_functions):
+    """
+    Returns a function body and a fun_dict with n_functions helpers.
+
+    Args:
+        n_functions (int): Number of known helper functions.
+
+    Returns:
+        tuple: (body, fun_dict)
+    """
+    fun_dict = {f"helper{idx}": [("ValueError", idx)]
+                for idx in range(n_functions)}
+
+    body = "\n".join(f"    value = helper{idx % n_functions}(value) + 1"
+                     for idx in range(BODY_LINES))
+
+    return body, fun_dict
+
+
+def best_time(function, repeat=5):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+
+    print(f"{'functions':>10} {'legacy (ms)':>12} {'indexed (ms)':>13}"
+          f" {'speedup':>8}")
+
+    for n_functions in (10, 50, 100, 500, 1000, 5000):
+        body, fun_dict = synthetic_input(n_functions)
+
+        assert (legacy_call_excs(body, fun_dict)
+                == indexed_call_excs(body, fun_dict))
+
+        legacy = best_time(lambda: legacy_call_excs(body, fun_dict))
+        indexed = best_time(lambda: indexed_call_excs(body, fun_dict))
+
+        print(f"{n_functions:>10} {legacy*1000:>12.2f} {indexed*1000:>13.2f}"
+              f" {legacy/indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_engines.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from exceptions import function_exception_table  # noqa: E402
+from ast_engine import function_exception_table as ast_exception_table  # noqa: E402,E501
+
+
+TESTS_DIR = os.path.join(os.path.dirname(__file__), "..", "tests")
+
+# Sample files of tests/, the other files there are run by pytest.
+SAMPLE_FILES = ["test.py", "test2.py"]
+
+ENGINES = {
+    "lines": function_exception_table,
+    "ast": ast_exception_table,
+}
+
+
+def best_time(function, repeat=20):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+
+    filenames = [os.path.join(TESTS_DIR, filename)
+                 for filename in SAMPLE_FILES]
+
+    print(f"{'file':<12}"
+          + "".join(f"{name + ' (ms)':>12}" for name in ENGINES)
+          + f"{'same result':>14}")
+
+    for filename in filenames:
+        times = {name: best_time(lambda: engine(filename))
+                 for name, engine in ENGINES.items()}
+        # The tables are mappings, compared by their contents.
+        results = [engine(filename) for engine in ENGINES.values()]
+        same = all(result == results[0] for result in results[1:])
+
+        print(f"{os.path.basename(filename):<12}"
+              + "".join(f"{elapsed*1000:>12.3f}"
+                        for elapsed in times.values())
+              + f"{str(same):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_functions.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from code_parsing import scan_functions  # noqa: E402
+
+
+FUNCTION_TEMPLATE = '''
+def function{idx}(arg1, arg2):
+    """
+    Synthetic function number {idx}.
+    """
+    total = arg1 + arg2
+    if total > {idx}:
+        raise ValueError("too big")
+
+    try:
+        return arg1 / arg2
+    except ZeroDivisionError:
+        return 0
+'''
+
+
+def synthetic_module(n_functions):
+    """
+    Returns the lines of a synthetic module with n_functions functions.
+
+    Args:
+        n_functions (int): Number of functions in the module.
+
+    Returns:
+        list: Lines of the module.
+    """
+    text = "".join(FUNCTION_TEMPLATE.format(idx=idx)
+                   for idx in range(n_functions))
+    return text.splitlines(keepends=True)
+
+
+def best_time(function, repeat=5):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+
+    print(f"{'functions':>10} {'lines':>8} {'time (ms)':>10} {'us/line':>8}")
+
+    for n_functions in (100, 200, 400, 800, 1600, 3200):
+        lines = synthetic_module(n_functions)
+        elapsed = best_time(lambda: sum(1 for _ in scan_functions(lines)))
+
+        print(f"{n_functions:>10} {len(lines):>8} "
+              f"{elapsed*1000:>10.2f} {elapsed/len(lines)*1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_line_table.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from code_parsing import Functions  # noqa: E402
+from code_parsing import TryExceptBlocks  # noqa: E402
+from exceptions import function_summary  # noqa: E402
+from exceptions import line_exceptions  # noqa: E402
+from functions import call_names  # noqa: E402
+from functions import typed_call  # noqa: E402
+from functions import variable_type  # noqa: E402
+from string_utils import remove_string_literals  # noqa: E402
+from synthetic import synthetic_module  # noqa: E402
+
+
+def per_line_summary(fun_body):
+    """
+    Function summary as it was computed before lines were classified up
+    front: every line is cleaned and matched against each pattern on its
+    own, and the try-except blocks classify the lines again.
+
+    Args:
+        fun_body (str): Body of the function.
+
+    Returns:
+        list: Regions of the function, see exceptions.function_summary().
+    """
+    blocks = TryExceptBlocks(fun_body)
+    regions = {}
+    variable_types = {}
+
+    for line_idx, line in enumerate(fun_body.split("\n")):
+
+        if line.lstrip().startswith("#"):
+            continue
+
+        clean_line = remove_string_literals(f"{line}\n")
+        excs = line_exceptions(clean_line)
+        calls = [typed_call(fun_name, variable_types)
+                 for fun_name in call_names(clean_line)]
+
+        type_hint = variable_type(clean_line)
+        if type_hint is not None:
+            variable_types[type_hint[0]] = type_hint[1]
+
+        if not excs and not calls:
+            continue
+
+        segment, handled = blocks.scope(line_idx)
+        region_excs, region_calls, _ = regions.setdefault(
+            segment, ([], [], list(handled)))
+
+        region_excs.extend((exc, line_idx+1) for exc in dict.fromkeys(excs))
+        region_calls.extend((fun_name, line_idx+1) for fun_name in calls)
+
+    return [regions[segment] for segment in sorted(regions)]
+
+
+def module_bodies(source):
+    """
+    Returns the bodies of the functions of a module.
+
+    Args:
+        source (str): Source of the module.
+
+    Returns:
+        list: Bodies of the functions.
+    """
+    return [fun_body
+            for _, _, fun_body in Functions("<source>",
+                                            file=io.StringIO(source))]
+
+
+def best_time(function, repeat=3):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+
+    inputs = [(f"synthetic x{n_functions}",
+               synthetic_module(n_functions=n_functions, body_lines=40,
+                                depth=2, call_density=0.3))
+              for n_functions in (500, 2000, 8000)]
+
+    # The standard library, as a sample of real code.
+    stdlib_dir = os.path.dirname(os.__file__)
+    stdlib = []
+    for filename in sorted(os.listdir(stdlib_dir)):
+        if filename.endswith(".py"):
+            with open(os.path.join(stdlib_dir, filename), "r",
+                      errors="replace") as file:
+                stdlib.append(file.read())
+    inputs.append(("stdlib", "\n".join(stdlib)))
+
+    print(f"{'input':>16} {'MB':>6} {'per line (ms)':>14} {'table (ms)':>11}"
+          f" {'speedup':>8}")
+
+    for name, source in inputs:
+        bodies = module_bodies(source)
+
+        assert ([per_line_summary(fun_body) for fun_body in bodies]
+                == [function_summary(fun_body) for fun_body in bodies])
+
+        per_line = best_time(lambda: [per_line_summary(fun_body)
+                                      for fun_body in bodies])
+        table = best_time(lambda: [function_summary(fun_body)
+                                   for fun_body in bodies])
+
+        print(f"{name:>16} {len(source) / 2**20:>6.1f} {per_line*1000:>14.0f}"
+              f" {table*1000:>11.0f} {per_line/table:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_occurrences.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from occurrences import OccurrenceStore  # noqa: E402
+
+
+EXCEPTIONS = ["ValueError", "IndexError", "ZeroDivisionError", "KeyError",
+              "FileNotFoundError", "PermissionError", "TypeError"]
+
+
+def occurrence_table(n_functions, per_function):
+    """
+    Returns a table of functions with the given number of occurrences each,
+    spread over their lines.
+
+    Args:
+        n_functions (int): Number of functions.
+        per_function (int): Occurrences per function.
+
+    Returns:
+        dict: table[fun_name] = [(exception_name, line_idx), ...]
+    """
+    return {f"function{idx}": [(EXCEPTIONS[site % len(EXCEPTIONS)],
+                                idx * per_function + site // 2)
+                               for site in range(per_function)]
+            for idx in range(n_functions)}
+
+
+def traced_size(build):
+    """
+    Returns the memory allocated by a function that is still alive after
+    it returns.
+
+    Args:
+        build (callable): Function to measure, called without arguments.
+
+    Returns:
+        tuple: (result, bytes)
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+
+    print(f"{'occurrences':>12} {'lists (B/occ)':>14} {'store (B/occ)':>14}")
+
+    for n_functions in (1000, 10000, 50000):
+        per_function = 6
+        occurrences = n_functions * per_function
+
+        table, table_size = traced_size(
+            lambda: occurrence_table(n_functions, per_function))
+        _, store_size = traced_size(lambda: OccurrenceStore(table))
+
+        print(f"{occurrences:>12} {table_size/occurrences:>14.1f} "
+              f"{store_size/occurrences:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
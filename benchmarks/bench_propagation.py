@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_propagation.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from exceptions import function_exception_table  # noqa: E402
+
+
+def call_chain(n_functions, cycle=False):
+    """
+    Returns a module where each function calls the next one, defined
+    further down the file, and the last one raises an exception.
+
+    Args:
+        n_functions (int): Length of the chain.
+        cycle (bool): Whether the last function calls the first one too,
+                      making the whole chain mutually recursive.
+
+    Returns:
+        str: Source of the module.
+    """
+    text = ""
+    for idx in range(n_functions - 1):
+        text += f"\ndef function{idx}(value):\n"
+        text += f"    return function{idx + 1}(value) + 1\n\n"
+
+    text += f"\ndef function{n_functions - 1}(value):\n"
+    if cycle:
+        text += "    function0(value)\n"
+    text += "    raise ValueError\n"
+
+    return text
+
+
+def best_time(function, repeat=3):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+
+    print(f"{'shape':>6} {'functions':>10} {'time (ms)':>10} "
+          f"{'us/function':>12} {'propagated':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "chain.py")
+
+        for cycle in (False, True):
+            for n_functions in (100, 200, 400, 800, 1600, 3200):
+                with open(filename, "w") as file:
+                    file.write(call_chain(n_functions, cycle))
+
+                # A fresh memo each time, so every body is analysed.
+                elapsed = best_time(
+                    lambda: function_exception_table(filename, {}))
+                fun_dict, _ = function_exception_table(filename)
+                propagated = ("ValueError"
+                              in dict(fun_dict["function0"]))
+
+                print(f"{'cycle' if cycle else 'chain':>6} "
+                      f"{n_functions:>10} {elapsed*1000:>10.2f} "
+                      f"{elapsed/n_functions*1e6:>12.2f} "
+                      f"{str(propagated):>11}")
+
+
+if __name__ == "__main__":
+    main()
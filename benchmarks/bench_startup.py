@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+@file     bench_startup.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "src")
+TEST_FILE = os.path.join(SRC_DIR, "..", "tests", "test.py")
+
+
+def import_times():
+    """
+    Returns the import times reported by python -X importtime for the
+    modules imported by main.py.
+
+    Returns:
+        dict: times[module] = (self_us, cumulative_us)
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                              "import main"],
+                             cwd=SRC_DIR, capture_output=True, text=True,
+                             check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, module = line[12:].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+
+    return times
+
+
+def run_time(*options):
+    """
+    Returns the wall time of a run of main.py on the test file, without
+    the cache and with its output discarded.
+
+    Args:
+        *options (str): Extra command line options.
+
+    Returns:
+        float: Time in seconds.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "main.py", "--no-cache", *options,
+                    TEST_FILE],
+                   cwd=SRC_DIR, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Measures the startup time of main.py and fails if "
+                    "importing it takes longer than the budget.")
+    parser.add_argument("--budget",
+                        type=float,
+                        default=50.0,
+                        help="allowed import time of main.py, in ms "
+                             "(default: 50)")
+    parser.add_argument("--repeat",
+                        type=int,
+                        default=10,
+                        help="runs of each measure, the best one is kept "
+                             "(default: 10)")
+    parser.add_argument("--top",
+                        type=int,
+                        default=10,
+                        help="slowest modules to show (default: 10)")
+    args = parser.parse_args()
+
+    # The first run compiles the modules, it is not counted.
+    import_times()
+    best = min((import_times() for _ in range(args.repeat)),
+               key=lambda times: times["main"][1])
+    import_ms = best["main"][1] / 1000
+
+    print(f"Slowest {args.top} modules to import (self time):")
+    for module, (self_us, cumulative_us) in sorted(
+            best.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{self_us/1000:>8.2f} ms {cumulative_us/1000:>8.2f} ms  "
+              f"{module}")
+
+    for options in ([], ["--color=always"], ["--format=jsonl"]):
+        seconds = min(run_time(*options) for _ in range(args.repeat))
+        print(f"\nmain.py {' '.join(options) or '(no options)'}: "
+              f"{seconds*1000:.1f} ms", end="")
+
+    print(f"\n\nimport main: {import_ms:.1f} ms "
+          f"(budget: {args.budget:.1f} ms)")
+
+    if import_ms > args.budget:
+        print("Over budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+"""
+@file     suite.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from code_parsing import Functions  # noqa: E402
+from code_parsing import TryExceptBlocks  # noqa: E402
+from exceptions import raised_exceptions  # noqa: E402
+from exceptions import function_exception_table  # noqa: E402
+from string_utils import table_str  # noqa: E402
+from synthetic import synthetic_module  # noqa: E402
+
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "history.json")
+
+# Arguments of synthetic_module() shared by every scenario.
+BASE = {"n_functions": 50, "body_lines": 20, "depth": 1, "call_density": 0.2}
+
+# Each dimension varies one argument of BASE, the others stay the same.
+DIMENSIONS = {
+    "size": ("body_lines", [10, 40, 160]),
+    "functions": ("n_functions", [50, 200, 800]),
+    "depth": ("depth", [1, 4, 8]),
+    "calls": ("call_density", [0.25, 0.5, 1.0]),
+}
+
+# Differences below this many seconds are never reported as regressions.
+NOISE_FLOOR = 0.002
+
+
+def stage_functions(filename, bodies, result):
+    list(Functions(filename))
+
+
+def stage_try_blocks(filename, bodies, result):
+    for body in bodies:
+        list(TryExceptBlocks(body))
+
+
+def stage_raised(filename, bodies, result):
+    for body in bodies:
+        raised_exceptions(body)
+
+
+def stage_table(filename, bodies, result):
+    function_exception_table(filename, {})
+
+
+def stage_report(filename, bodies, result):
+    table_str(filename, *result)
+
+
+STAGES = {
+    "Functions": stage_functions,
+    "TryExceptBlocks": stage_try_blocks,
+    "raised_exceptions": stage_raised,
+    "function_exception_table": stage_table,
+    "table_str": stage_report,
+}
+
+
+def best_time(function, repeat=3):
+    """
+    Returns the best wall time out of several calls to a function.
+
+    Args:
+        function (callable): Function to time, called without arguments.
+        repeat (int): Number of calls.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def scenarios():
+    """
+    Returns the scenarios of the suite, by name.
+
+    Returns:
+        dict: scenarios[name] = arguments of synthetic_module()
+    """
+    named = {}
+    for dimension, (argument, values) in DIMENSIONS.items():
+        for value in values:
+            named[f"{dimension}={value}"] = {**BASE, argument: value}
+    return named
+
+
+def run_suite(repeat=3):
+    """
+    Times every stage on every scenario.
+
+    Args:
+        repeat (int): Number of runs of each stage, the best one is kept.
+
+    Returns:
+        dict: results[scenario][stage] = seconds
+    """
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "synthetic.py")
+
+        for name, arguments in scenarios().items():
+            with open(filename, "w") as file:
+                file.write(synthetic_module(**arguments))
+
+            bodies = [body for _, _, body in Functions(filename)]
+            result = function_exception_table(filename, {})
+
+            results[name] = {
+                stage: best_time(lambda: function(filename, bodies, result),
+                                 repeat)
+                for stage, function in STAGES.items()}
+
+    return results
+
+
+def growth_exponents(results):
+    """
+    Returns how fast each stage grows along each dimension, as the exponent
+    k of time ~ value^k between the smallest and the largest value. An
+    exponent close to 2 or above points at a quadratic path.
+
+    Args:
+        results (dict): See run_suite().
+
+    Returns:
+        dict: exponents[dimension][stage] = k
+    """
+    exponents = {}
+    for dimension, (_, values) in DIMENSIONS.items():
+        first = results[f"{dimension}={values[0]}"]
+        last = results[f"{dimension}={values[-1]}"]
+        scale = math.log(values[-1] / values[0])
+
+        exponents[dimension] = {
+            stage: math.log(max(last[stage], 1e-9)
+                            / max(first[stage], 1e-9)) / scale
+            for stage in STAGES}
+
+    return exponents
+
+
+def regressions(results, history, threshold, window=5):
+    """
+    Compares the results with the best time of the last runs in the
+    history.
+
+    Args:
+        results (dict): See run_suite().
+        history (list): Previous runs, oldest first.
+        threshold (float): Allowed slowdown, 0.25 is 25% slower.
+        window (int): Number of previous runs to compare with.
+
+    Returns:
+        list: [(scenario, stage, seconds, baseline_seconds), ...]
+    """
+    found = []
+
+    for scenario, stages in results.items():
+        for stage, seconds in stages.items():
+            previous = [run["results"][scenario][stage]
+                        for run in history[-window:]
+                        if stage in run["results"].get(scenario, {})]
+            if not previous:
+                continue
+
+            baseline = min(previous)
+            if (seconds > baseline * (1 + threshold)
+                    and seconds - baseline > NOISE_FLOOR):
+                found.append((scenario, stage, seconds, baseline))
+
+    return found
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(filename):
+    try:
+        with open(filename, "r") as file:
+            return json.load(file)
+
+    except FileNotFoundError:
+        return []
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Times each stage of the analysis on synthetic modules "
+                    "and fails if any of them got slower.")
+    parser.add_argument("--history",
+                        default=DEFAULT_HISTORY,
+                        help=f"JSON file with the previous runs "
+                             f"(default: {DEFAULT_HISTORY})")
+    parser.add_argument("--threshold",
+                        type=float,
+                        default=0.25,
+                        help="allowed slowdown of a stage against the best "
+                             "of the last runs (default: 0.25)")
+    parser.add_argument("--window",
+                        type=int,
+                        default=5,
+                        help="number of previous runs to compare with "
+                             "(default: 5)")
+    parser.add_argument("--repeat",
+                        type=int,
+                        default=3,
+                        help="runs of each stage, the best one is kept "
+                             "(default: 3)")
+    parser.add_argument("--no-save",
+                        action="store_true",
+                        help="do not add this run to the history")
+    args = parser.parse_args()
+
+    results = run_suite(args.repeat)
+
+    names = list(STAGES)
+    print(f"{'scenario':>16} " + " ".join(f"{name[:12]:>12}"
+                                          for name in names))
+    for scenario, stages in results.items():
+        print(f"{scenario:>16} " + " ".join(f"{stages[name]*1000:>12.2f}"
+                                            for name in names))
+
+    print(f"\n{'growth':>16} " + " ".join(f"{name[:12]:>12}"
+                                          for name in names))
+    for dimension, stages in growth_exponents(results).items():
+        print(f"{dimension:>16} " + " ".join(f"{stages[name]:>12.2f}"
+                                             for name in names))
+
+    history = load_history(args.history)
+    found = regressions(results, history, args.threshold, args.window)
+
+    if not args.no_save:
+        history.append({"date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "commit": current_commit(),
+                        "python": platform.python_version(),
+                        "results": results})
+        with open(args.history, "w") as file:
+            json.dump(history, file, indent=1)
+
+    if not found:
+        print(f"\nNo regressions against the last {args.window} run(s).")
+        return
+
+    print("\nRegressions:")
+    for scenario, stage, seconds, baseline in found:
+        print(f"  {scenario} {stage}: {baseline*1000:.2f} ms -> "
+              f"{seconds*1000:.2f} ms")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
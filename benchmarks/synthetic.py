@@ -0,0 +1,95 @@
+"""
+@file     synthetic.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import random
+
+
+# Single-line statements that may raise, or not, on their own.
+STATEMENTS = [
+    "value = int(text)",
+    "value = items[value]",
+    "value = total / value",
+    "value = value + 1",
+    "text = str(value)",
+    "value = len(text)",
+]
+
+# Exceptions caught by the try-except blocks, by nesting level.
+CAUGHT = [
+    "ValueError",
+    "IndexError",
+    "(KeyError, IndexError)",
+    "ArithmeticError",
+    "LookupError",
+]
+
+
+def _nested_block(statements, depth, indent):
+    """
+    Returns the statements of a function body, spread evenly over depth
+    levels of nested try-except blocks.
+
+    Args:
+        statements (list): Statements of the block, without indentation.
+        depth (int): Number of nested try-except blocks.
+        indent (int): Indentation of the block.
+
+    Returns:
+        list: Lines of the block.
+    """
+    pad = " " * indent
+
+    if depth == 0 or len(statements) < 2:
+        return [pad + statement for statement in statements]
+
+    outside = max(1, len(statements) // (depth + 1))
+
+    return ([pad + statement for statement in statements[:outside]]
+            + [pad + "try:"]
+            + _nested_block(statements[outside:], depth - 1, indent + 4)
+            + [pad + f"except {CAUGHT[depth % len(CAUGHT)]}:",
+               pad + "    value = 0"])
+
+
+def synthetic_module(n_functions=50, body_lines=20, depth=1,
+                     call_density=0.2, seed=0):
+    """
+    Returns the source of a synthetic module, the same for the same
+    arguments.
+
+    Args:
+        n_functions (int): Number of functions.
+        body_lines (int): Number of statements per function, besides the
+                          try-except blocks.
+        depth (int): Number of nested try-except blocks per function.
+        call_density (float): Probability of a statement being a call to
+                              another function of the module.
+        seed (int): Seed of the random choices.
+
+    Returns:
+        str: Source of the module.
+    """
+    rng = random.Random(seed)
+    lines = ['"""Synthetic module."""', ""]
+
+    for idx in range(n_functions):
+        statements = [f"value = function{rng.randrange(n_functions)}(value)"
+                      if rng.random() < call_density
+                      else rng.choice(STATEMENTS)
+                      for _ in range(body_lines)]
+
+        lines += ["", "",
+                  f"def function{idx}(value, text, items, total):",
+                  '    """Synthetic function."""']
+        lines += _nested_block(statements, depth, 4)
+
+        if idx % 5 == 0:
+            lines += ["    if value < 0:",
+                      "        raise RuntimeError('negative value')"]
+
+        lines += ["    return value"]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,280 @@
+"""
+@file     ast_engine.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import ast
+from exceptions import documented_exceptions
+from exceptions import propagate_exceptions
+from functions import known_function_excs
+from functions import typed_call
+from occurrences import OccurrenceStore
+from symbols import SymbolTable
+
+
+def _handler_names(handler):
+    """
+    Returns the names of the exceptions caught by an except clause.
+
+    Args:
+        handler (ast.ExceptHandler): Except clause.
+
+    Returns:
+        set: Names of the exceptions caught by the clause.
+    """
+    if handler.type is None:
+        return {"BaseException"}
+
+    types = (handler.type.elts
+             if isinstance(handler.type, ast.Tuple)
+             else [handler.type])
+
+    return {ast.unparse(exc_type).rsplit(".", maxsplit=1)[-1]
+            for exc_type
+            in types}
+
+
+def _call_name(call):
+    """
+    Returns the name of the function called, as written, or None if it has
+    no name.
+
+    Args:
+        call (ast.Call): Function call.
+
+    Returns:
+        str: Name of the function, like 'function' or 'module.function'.
+    """
+    parts = []
+    node = call.func
+
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+
+    return parts[0] if parts else None
+
+
+class _BodyVisitor(ast.NodeVisitor):
+    """
+    Builds the summary of a function from its body: the exceptions it
+    raises by itself and the functions it calls, by the try-except blocks
+    that enclose them, like exceptions.function_summary().
+    """
+
+    def __init__(self):
+        # Exceptions caught by the try-except blocks around each node.
+        self.caught = [()]
+        # regions[caught] = (excs, calls), in order of appearance.
+        self.regions = {}
+        # Classes of the local variables, to resolve the methods called on
+        # them, like functions.variable_type().
+        self.variable_types = {}
+
+    def _region(self):
+        caught = self.caught[-1]
+        if caught not in self.regions:
+            self.regions[caught] = ({}, [])
+        return self.regions[caught]
+
+    def _add(self, exc, line_idx):
+        self._region()[0][(exc, line_idx)] = None
+
+    def summary(self):
+        """
+        Returns the summary of the visited body.
+
+        Returns:
+            list:   Regions of the function, see
+                    exceptions.function_summary(). Line indexes are the
+                    line numbers of the file.
+        """
+        return [(list(excs), calls, list(caught))
+                for caught, (excs, calls) in self.regions.items()]
+
+    def visit_Try(self, node):
+        caught = {exc
+                  for handler
+                  in node.handlers
+                  for exc
+                  in _handler_names(handler)}
+
+        self.caught.append(tuple(dict.fromkeys((*self.caught[-1],
+                                                *sorted(caught)))))
+        for stmt in node.body:
+            self.visit(stmt)
+        self.caught.pop()
+
+        for stmt in node.handlers + node.orelse + node.finalbody:
+            self.visit(stmt)
+
+    visit_TryStar = visit_Try
+
+    def visit_Raise(self, node):
+        self.generic_visit(node)
+        if node.exc is None:
+            return
+
+        exc = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+        self._add(ast.unparse(exc), node.lineno)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        name = _call_name(node)
+        if name is None:
+            return
+
+        # Implicit exceptions (built-in and library functions)
+        for exc in known_function_excs(name):
+            self._add(exc, node.lineno)
+
+        # Implicit exceptions (user-defined functions), once the whole file
+        # is known.
+        self._region()[1].append((typed_call(name, self.variable_types),
+                                  node.lineno))
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        if not isinstance(node.value, ast.Call):
+            return
+
+        class_name = _call_name(node.value)
+        if class_name is None:
+            return
+
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.variable_types[target.id] = class_name
+
+    def visit_AnnAssign(self, node):
+        self.generic_visit(node)
+        if isinstance(node.target, ast.Name):
+            self.variable_types[node.target.id] = ast.unparse(node.annotation)
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        self._add("IndexError", node.lineno)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, (ast.Div, ast.FloorDiv)):
+            self._add("ZeroDivisionError", node.lineno)
+
+    def visit_AugAssign(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, (ast.Div, ast.FloorDiv)):
+            self._add("ZeroDivisionError", node.lineno)
+
+
+def _functions(node, symbols, prefix=""):
+    """
+    Yields the function definitions in a tree in source order, adding the
+    classes that contain them to a symbol table. Functions nested inside
+    other functions are not yielded, they are part of the body of the
+    enclosing function, like in code_parsing.Functions.
+
+    Args:
+        node (ast.AST): Root of the tree.
+        symbols (SymbolTable): Symbol table of the file.
+        prefix (str): Qualified name of the enclosing class, and a dot.
+
+    Yields:
+        tuple: (qualified_name, ast.FunctionDef)
+    """
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield prefix + child.name, child
+            continue
+
+        if isinstance(child, ast.ClassDef):
+            symbols.add_class(prefix + child.name,
+                              [ast.unparse(base) for base in child.bases])
+            yield from _functions(child, symbols, prefix + child.name + ".")
+            continue
+
+        yield from _functions(child, symbols, prefix)
+
+
+def function_summary(fun_name, fun_node):
+    """
+    Returns the summary of a function, see _BodyVisitor.
+
+    Args:
+        fun_name (str): Qualified name of the function, the one its time
+                        is added to by profiling.Profiler.
+        fun_node (ast.FunctionDef): Definition of the function.
+
+    Returns:
+        list: Regions of the function, see exceptions.function_summary().
+    """
+    visitor = _BodyVisitor()
+    for stmt in fun_node.body:
+        visitor.visit(stmt)
+
+    return visitor.summary()
+
+
+def function_exception_table(filename, file=None):
+    """
+    Returns a table of functions and the exceptions they raise, using a
+    single ast.parse() of the file instead of the line based analysis.
+    Methods are named after their class, like 'Class.method'.
+
+    Args:
+        filename (str): Path to the file.
+        file (io.TextIOBase):   Open text file to read instead of opening
+                                filename, see code_parsing.Functions.
+
+    Returns:
+        tuple:  (fun_dict, documented_dict)
+                fun_dict is an occurrences.OccurrenceStore, read like
+                fun_dict[fun_name] = [(exception_name, line_idx), ...]
+                documented_dict[fun_name] = {exception_name, ...}
+
+    Raises:
+        OSError: If the file cannot be opened for any reason.
+        SyntaxError: If the file is not valid Python code.
+    """
+    try:
+        with open(filename, "r") if file is None else file as source_file:
+            source = source_file.read()
+
+    except UnicodeDecodeError:
+        raise OSError(f"File '{filename}' is not a text file.")
+
+    tree = ast.parse(source, filename=filename)
+
+    fun_dict = {}
+    documented_dict = {}
+    functions = []
+
+    # Exceptions defined in the file are only known while it is analysed.
+    symbols = SymbolTable()
+    try:
+        for fun_name, fun_node in _functions(tree, symbols):
+
+            # Undocumented exceptions. The summaries hold line numbers, so
+            # they are resolved from line 0.
+            functions.append((0, fun_name,
+                              function_summary(fun_name, fun_node)))
+
+            # Documented exceptions
+            docstring_text = ast.get_docstring(fun_node, clean=False)
+            documented_dict[fun_name] = documented_exceptions(docstring_text)
+
+        # Calls are resolved once every function is known, wherever it is
+        # defined in the file, like in the line based analysis.
+        results = propagate_exceptions(functions, symbols=symbols)
+
+    finally:
+        symbols.unregister_exceptions()
+
+    for (_, fun_name, _), result in zip(functions, results):
+        fun_dict[fun_name] = result
+
+    return OccurrenceStore(fun_dict), documented_dict
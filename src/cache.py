@@ -0,0 +1,210 @@
+"""
+@file     cache.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import glob
+import json
+import os
+from hashlib import sha256
+from database import DATABASE_VERSION
+from signatures import signatures_version
+from occurrences import OccurrenceStore
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "exception-control")
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+_ANALYZER_VERSION = None
+
+
+def analyzer_version():
+    """
+    Returns a fingerprint of the source code of the analyzer, so that
+    results computed by a different version of it are not reused.
+
+    Returns:
+        str: Fingerprint of the analyzer.
+    """
+    global _ANALYZER_VERSION
+
+    if _ANALYZER_VERSION is None:
+        digest = sha256()
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        for filename in sorted(glob.glob(os.path.join(src_dir, "*.py"))):
+            with open(filename, "rb") as file:
+                digest.update(file.read())
+        _ANALYZER_VERSION = digest.hexdigest()[:16]
+
+    return _ANALYZER_VERSION
+
+
+class ResultCache:
+    """
+    On-disk cache of the results of function_exception_table(), keyed by
+    the contents of the analysed file, and of the function summaries of the
+    last analysis of each file. Entries are JSON files, evicted least
+    recently used first when the cache grows past max_size bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR,
+                 max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    def key(self, source, engine):
+        """
+        Returns the key of the results for a file.
+
+        Args:
+            source (bytes): Contents of the file.
+            engine (str): Name of the engine used to analyse it.
+
+        Returns:
+            str: Key of the results.
+        """
+        digest = sha256(f"{analyzer_version()}:{DATABASE_VERSION}:"
+                        f"{signatures_version()}:{engine}:".encode())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the cached results for a key.
+
+        Args:
+            key (str): Key of the results, see key().
+
+        Returns:
+            tuple:  (fun_dict, documented_dict), or None if the results
+                    are not cached. fun_dict is an
+                    occurrences.OccurrenceStore.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "r") as file:
+                entry = json.load(file)
+            os.utime(path)
+
+        except (OSError, ValueError):
+            return None
+
+        fun_dict = OccurrenceStore(entry["table"])
+        documented_dict = {fun_name: set(excs)
+                           for fun_name, excs in entry["documented"].items()}
+
+        return fun_dict, documented_dict
+
+    def put(self, key, fun_dict, documented_dict):
+        """
+        Stores the results for a key. Errors writing to the cache are
+        ignored, the cache is just an optimization.
+
+        Args:
+            key (str): Key of the results, see key().
+            fun_dict (dict): fun_dict[fun_name] = [(exception, line), ...]
+            documented_dict (dict): documented_dict[fun_name] = {exc, ...}
+        """
+        entry = {
+            "table": dict(fun_dict),
+            "documented": {fun_name: sorted(excs)
+                           for fun_name, excs in documented_dict.items()},
+        }
+
+        self._write(self._path(key), entry)
+
+    def _memo_path(self, filename):
+        key = sha256(f"{analyzer_version()}:{DATABASE_VERSION}:"
+                     f"{signatures_version()}:"
+                     f"{os.path.abspath(filename)}".encode()).hexdigest()
+        return os.path.join(self.directory, "memo", f"{key}.json")
+
+    def get_memo(self, filename):
+        """
+        Returns the function summaries of the last analysis of a file, to
+        be passed to exceptions.function_exception_table().
+
+        Args:
+            filename (str): Path to the file.
+
+        Returns:
+            dict: memo[fingerprint] = (summary, documented), or an empty
+                  dict if the file was not analysed before.
+        """
+        try:
+            with open(self._memo_path(filename), "r") as file:
+                memo = json.load(file)
+
+        except (OSError, ValueError):
+            return {}
+
+        return {fingerprint: (summary, set(documented))
+                for fingerprint, (summary, documented) in memo.items()}
+
+    def put_memo(self, filename, memo):
+        """
+        Stores the function summaries of the last analysis of a file.
+
+        Args:
+            filename (str): Path to the file.
+            memo (dict): memo[fingerprint] = (summary, documented)
+        """
+        self._write(self._memo_path(filename),
+                    {fingerprint: (summary, sorted(documented))
+                     for fingerprint, (summary, documented) in memo.items()})
+
+    def _write(self, path, entry):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Written next to the entry and renamed, so that readers never
+            # see half an entry. The name is unique to this process.
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(entry, file)
+            os.replace(temp_path, path)
+
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in
+        max_size bytes.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*", "*.json")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+    def clear(self):
+        """
+        Removes every entry of the cache.
+        """
+        # Slow to import, and only needed here.
+        import shutil
+
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,209 @@
+"""
+@file     changes.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import re
+import subprocess
+from code_parsing import function_spans
+from occurrences import OccurrenceStore
+
+
+FILE_PATTERN = re.compile(r"^\+\+\+ b/(.+)$")
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def _git(*args):
+    """
+    Runs a git command in the current directory.
+
+    Args:
+        *args (str): Arguments of the command.
+
+    Returns:
+        str: Output of the command.
+
+    Raises:
+        OSError: If git is not installed or the command fails.
+    """
+    try:
+        process = subprocess.run(["git", *args], capture_output=True,
+                                 text=True, check=True)
+
+    except FileNotFoundError:
+        raise OSError("git not found.")
+
+    except subprocess.CalledProcessError as git_err:
+        raise OSError(f"git {args[0]} failed: {git_err.stderr.strip()}")
+
+    return process.stdout
+
+
+def parse_diff(diff_lines, root="."):
+    """
+    Returns the lines added or modified by a diff without context lines,
+    like the output of 'git diff -U0'.
+
+    Args:
+        diff_lines (iterable): Lines of the diff.
+        root (str): Directory the paths of the diff are relative to.
+
+    Returns:
+        dict:   changes[filename] = [(first_line, last_line), ...]
+                Line numbers start at 1 and refer to the new version of
+                each file. Removed lines are counted as changes to the
+                lines around them.
+    """
+    changes = {}
+    ranges = None
+
+    for line in diff_lines:
+
+        match = FILE_PATTERN.match(line)
+        if match is not None:
+            filename = os.path.relpath(os.path.join(root, match.group(1)))
+            ranges = changes.setdefault(filename, [])
+            continue
+
+        match = HUNK_PATTERN.match(line)
+        if match is None or ranges is None:
+            continue
+
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+
+        if count == 0:
+            ranges.append((max(start, 1), start + 1))
+        else:
+            ranges.append((start, start + count - 1))
+
+    return changes
+
+
+def changed_lines(paths=(), ref=None, staged=False):
+    """
+    Returns the lines of Python files changed according to git, in the
+    working tree or in the index.
+
+    Args:
+        paths (list): Files or directories to look for changes in. If
+                      empty, the whole repository.
+        ref (str):  Commit to compare with, like 'HEAD~1' or 'main'. If
+                    None, HEAD for staged changes, or the index otherwise.
+        staged (bool): Whether to look at the staged changes only.
+
+    Returns:
+        dict: changes[filename] = [(first_line, last_line), ...]
+              See parse_diff(). Removed files are left out.
+
+    Raises:
+        OSError: If git is not installed or the command fails, for
+                 example outside of a repository.
+    """
+    root = _git("rev-parse", "--show-toplevel").strip()
+
+    args = ["diff", "-U0", "--no-color", "--no-ext-diff", "--diff-filter=d"]
+    if staged:
+        args.append("--cached")
+    if ref is not None:
+        args.append(ref)
+
+    diff = _git(*args, "--", *paths)
+
+    return {filename: ranges
+            for filename, ranges in parse_diff(diff.splitlines(),
+                                               root).items()
+            if filename.endswith(".py")}
+
+
+def changed_functions(filename, ranges):
+    """
+    Returns the functions of a file that overlap the given lines.
+
+    Args:
+        filename (str): Path to the file.
+        ranges (list): [(first_line, last_line), ...], see parse_diff().
+
+    Returns:
+        set: Names of the functions.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    return {fun_name
+            for fun_name, spans in function_spans(filename).items()
+            if any(first <= last_changed and first_changed <= last
+                   for first, last in spans
+                   for first_changed, last_changed in ranges)}
+
+
+def changed_files(paths=(), ref=None, staged=False):
+    """
+    Returns the Python files changed according to git, and the functions
+    changed in each of them. Files where only code outside of functions
+    changed are left out.
+
+    Args:
+        paths (list): See changed_lines().
+        ref (str): See changed_lines().
+        staged (bool): See changed_lines().
+
+    Returns:
+        dict:   changed[filename] = {fun_name, ...}
+                The functions of the files that cannot be read are None.
+
+    Raises:
+        OSError: If git is not installed or the command fails.
+    """
+    changed = {}
+
+    for filename, ranges in changed_lines(paths, ref, staged).items():
+        try:
+            fun_names = changed_functions(filename, ranges)
+
+        # Analysed anyway, so that the error is reported.
+        except OSError:
+            fun_names = None
+
+        if fun_names is None or fun_names:
+            changed[filename] = fun_names
+
+    return changed
+
+
+def changed_results(results, changed):
+    """
+    Keeps only the results of the changed functions of the changed files.
+
+    Args:
+        results (iterable): (filename, fun_dict, documented_dict, error)
+                            for each file, see runner.analyze_file().
+        changed (dict): changed[filename] = {fun_name, ...}, as returned
+                        by changed_files(). Filenames are matched by the
+                        file they point to, so relative and absolute paths
+                        to the same file are the same.
+
+    Yields:
+        tuple:  (filename, fun_dict, documented_dict, error) for each
+                changed file, in the same order as results.
+    """
+    changed = {os.path.realpath(filename): fun_names
+               for filename, fun_names in changed.items()}
+
+    for filename, fun_dict, documented_dict, error in results:
+
+        fun_names = changed.get(os.path.realpath(filename), ())
+        if fun_names is None:
+            yield filename, fun_dict, documented_dict, error
+
+        elif fun_names:
+            yield (filename,
+                   OccurrenceStore({fun_name: fun_dict[fun_name]
+                                    for fun_name in fun_dict
+                                    if fun_name in fun_names}),
+                   {fun_name: documented
+                    for fun_name, documented in documented_dict.items()
+                    if fun_name in fun_names},
+                   error)
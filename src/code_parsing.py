@@ -5,71 +5,329 @@
 """
 
 
-from string_utils import grab
-from string_utils import line_indentation
-from string_utils import index_in_list
-from string_utils import first_nonempty_line
+import re
+from bisect import bisect_right
+from string_utils import remove_string_literals
+from line_table import LineTable
+from line_table import BLANK
+from line_table import COMMENT
 
 
-def cut_function_body(text_lines, try_except_block=False):
+DEF_PATTERN = re.compile(r"^\s*(?:async\s+)?def\s+(\w+)\s*\(")
+CLASS_PATTERN = re.compile(r"^\s*class\s+(\w+)\s*(?:\(([^)]*)\))?")
+
+# Comments, triple quotes and strings of a single line, the ones that can
+# hide a triple quote or leave a string open at the end of a line.
+TRIPLE_QUOTES = ('"""', "'''")
+STRING_START_PATTERN = re.compile(r"#|\"\"\"|'''"
+                                  r"|\"(?:[^\"\\\n]|\\.)*\"?"
+                                  r"|'(?:[^'\\\n]|\\.)*'?")
+
+
+def _declaration_end(declaration):
+    """
+    Checks whether a (possibly multiline) function declaration is complete,
+    that is, its parentheses are balanced and it is followed by a colon.
+
+    Args:
+        declaration (str): Declaration text accumulated so far.
+
+    Returns:
+        str:    Code found after the colon, empty for regular functions.
+                None if the declaration is not complete yet.
+    """
+    code = "".join(remove_string_literals(line).split("#", maxsplit=1)[0]
+                   for line in declaration.splitlines())
+    if code.count("(") > code.count(")"):
+        return None
+
+    colon_idx = code.find(":", code.rfind(")"))
+    if colon_idx == -1:
+        return None
+
+    return code[colon_idx+1:].strip()
+
+
+def _open_string(line, quote=None):
+    """
+    Returns the triple quote of a string left open at the end of a line,
+    like the first line of a docstring of several lines.
+
+    Args:
+        line (str): Line of code.
+        quote (str): Triple quote of a string open before the line, or None.
+
+    Returns:
+        str: Triple quote of the open string, None if there is none.
+    """
+    # Most lines have no quotes, they cannot open or close a string.
+    if "'" not in line and '"' not in line:
+        return quote
+
+    idx = 0
+
+    while True:
+        if quote is not None:
+            end_idx = line.find(quote, idx)
+            if end_idx == -1:
+                return quote
+
+            quote = None
+            idx = end_idx + 3
+
+        match = STRING_START_PATTERN.search(line, idx)
+        if match is None or match.group() == "#":
+            return None
+
+        if match.group() in TRIPLE_QUOTES:
+            quote = match.group()
+
+        idx = match.end()
+
+
+def _open_brackets(line):
+    """
+    Checks whether a line of code leaves brackets open, outside of string
+    literals and comments.
+
+    Args:
+        line (str): Line of code.
+
+    Returns:
+        bool: Whether more brackets are opened than closed.
+    """
+    code = remove_string_literals(line).split("#", maxsplit=1)[0]
+    return (code.count("(") + code.count("[")
+            > code.count(")") + code.count("]"))
+
+
+def class_bases(bases):
     """
-    Receives a list of text lines of a function with a given indentation.
-    It detects the end of the function body by looking for the first line
-    with a lower indentation than the given one and crops out the rest.
+    Returns the base classes of a class declaration.
 
     Args:
-        text_lines (list): List of text lines of a function.
+        bases (str): Text between the parentheses of the declaration, like
+                     'Base, module.Mixin, metaclass=Meta'.
 
     Returns:
-        list: List of text lines of the function body.
+        list: Names of the base classes, as written.
+    """
+    return [base.strip()
+            for base in (bases or "").split(",")
+            if base.strip() and "=" not in base]
+
+
+def _add_class(classes, on_class, indentation, class_name, declaration):
+    """
+    Adds a class to the classes enclosing the next lines, once its whole
+    declaration has been read, and reports it to on_class.
+
+    Args:
+        classes (list): Enclosing classes, see scan_functions().
+        on_class (callable): See scan_functions(), or None.
+        indentation (int): Indentation of the declaration.
+        class_name (str): Qualified name of the class.
+        declaration (str): Declaration, possibly of several lines.
+    """
+    classes.append((indentation, class_name))
+
+    if on_class is not None:
+        code = " ".join(remove_string_literals(line).split("#", maxsplit=1)[0]
+                        for line in declaration.splitlines())
+        on_class(class_name, class_bases(CLASS_PATTERN.match(code).group(2)))
+
+
+def scan_functions(text_lines, on_class=None):
     """
-    indentation = line_indentation(first_nonempty_line(text_lines))
-    f_body = []
+    Walks a list (or any iterable) of text lines once and yields the
+    functions found in it, as soon as the end of each function is reached.
 
-    for line in text_lines:
+    Functions nested inside another function are part of the body of the
+    enclosing function and are not yielded on their own. Methods are yielded
+    with the qualified name of their class, like 'Class.method'.
 
-        # Comments are included to avoid messing up line numbers.
-        # In case the comment is unindentated, it is added to the body
-        # indentated to avoid future problems.
-        if line.lstrip().startswith("#"):
-            f_body.append(line_indentation(line)*" " + line.strip())
+    Args:
+        text_lines (iterable): Lines of Python code.
+        on_class (callable):    Called with the qualified name of each class
+                                and the names of its bases, as they are
+                                found. Classes inside functions are not.
+
+    Yields:
+        tuple:  (line_number, function_name, body)
+                line_number is the index of the line preceding the body, so
+                the first body line is line line_number + 1 of the file.
+    """
+    # Classes enclosing the current line, as (indentation, qualified_name).
+    classes = []
+    # Multiline class declaration, as [indentation, qualified_name, text].
+    class_declaration = None
+    # Triple quote of the string the current line is inside of, if any.
+    string_quote = None
+    function_name = None
+    declaration = None
+    def_indentation = 0
+    indentation = None
+    first_idx = 0
+    body = []
+
+    for line_idx, line in enumerate(text_lines):
+
+        in_string = string_quote is not None
+        string_quote = _open_string(line, string_quote)
+
+        # Multiline declarations are accumulated until they are complete.
+        if class_declaration is not None:
+            class_declaration[2] += line
+            if _declaration_end(class_declaration[2]) is None:
+                continue
+
+            _add_class(classes, on_class, *class_declaration)
+            class_declaration = None
+            continue
+
+        if declaration is not None:
+            declaration += line
+            rest = _declaration_end(declaration)
+            if rest is None:
+                continue
+
+            declaration = None
+            first_idx = line_idx + 1
+
+            # Multiline one-liners (overloads, stubs) end with the
+            # declaration itself.
+            if rest:
+                yield line_idx, function_name, (def_indentation+4)*" " + rest
+                function_name = None
             continue
 
-        # Nonempty line that drops below the indentation level.
-        if line.strip() and line_indentation(line) < indentation:
+        # Lines inside strings, like docstrings, are not code, even if they
+        # start with "class" or "def" or are not indented.
+        if in_string:
+            if function_name is not None:
+                body.append(line.rstrip())
+            continue
 
-            # If that happens outside of a try-except block, the function ends.
-            if not try_except_block:
-                break
+        # Worked out once, every check below reads them.
+        stripped = line.lstrip()
+        line_indent = len(line) - len(stripped)
 
-            # In try-except blocks, except: is allowed to be at a lower
-            # indentation level than the contents of the try block itself.
-            if not line.strip().startswith("except"):
-                break
+        if function_name is not None:
 
-        f_body.append(line.rstrip())
+            # Comments are included to avoid messing up line numbers.
+            # In case the comment is unindentated, it is added to the body
+            # indentated to avoid future problems.
+            if stripped.startswith("#"):
+                body.append(line_indent*" " + stripped.rstrip())
+                continue
 
-    return f_body
+            if not stripped:
+                body.append(line.rstrip())
+                continue
 
+            if indentation is None:
+                indentation = max(line_indent, def_indentation+1)
+
+            # Nonempty line that drops below the indentation level.
+            if line_indent >= indentation:
+                body.append(line.rstrip())
+                continue
+
+            yield first_idx, function_name, "\n".join(body)
+            function_name = None
+
+        # Code at the level of a class, or below, ends its body.
+        if stripped and not stripped.startswith("#"):
+            while classes and classes[-1][0] >= line_indent:
+                classes.pop()
+
+        prefix = classes[-1][1] + "." if classes else ""
+
+        match = CLASS_PATTERN.match(line)
+        if match is not None:
+            class_name = prefix + match.group(1)
+            if _declaration_end(line) is not None:
+                _add_class(classes, on_class, line_indent, class_name, line)
+
+            # Only declarations with brackets left open go on to the next
+            # lines, other lines are not declarations at all.
+            elif _open_brackets(line):
+                class_declaration = [line_indent, class_name, line]
+            continue
+
+        match = DEF_PATTERN.match(line)
+        if match is None:
+            continue
+
+        rest = _declaration_end(line)
+
+        # One-liners (def f(): return 1) are their own body.
+        if rest:
+            yield (line_idx, prefix + match.group(1),
+                   (line_indent+4)*" " + rest)
+            continue
+
+        function_name = prefix + match.group(1)
+        def_indentation = line_indent
+        indentation = None
+        body = []
+
+        if rest is None:
+            declaration = line
+        else:
+            first_idx = line_idx + 1
+
+    if function_name is not None and indentation is not None:
+        yield first_idx, function_name, "\n".join(body)
+
+
+def function_spans(filename):
+    """
+    Returns the lines spanned by each function of a file, from the last
+    line of its declaration to the last nonempty line of its body.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        dict:   spans[fun_name] = [(first_line, last_line), ...]
+                Line numbers start at 1. Functions with the same name, like
+                methods of different classes, have a span each.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    spans = {}
+
+    for line_number, fun_name, body in Functions(filename):
+        last_line = line_number + len(body.rstrip().split("\n"))
+        spans.setdefault(fun_name, []).append((line_number, last_line))
+
+    return spans
 
-class Functions:
 
-    text_lines = ""
-    from_idx = 0
+class Functions:
 
-    def __init__(self, filename):
+    def __init__(self, filename, on_class=None, file=None):
         """
-        Initializes the Functions object.
+        Initializes the Functions object. The file is read as the functions
+        are iterated, one line at a time, and closed once every function has
+        been yielded.
 
         Args:
             filename (str): Name of the file to parse.
+            on_class (callable): See scan_functions().
+            file (io.TextIOBase):   Open text file to read instead of
+                                    opening filename, like an io.StringIO
+                                    of code held in memory.
 
         Raises:
-            OSError: If the file cannot be opened or read.
+            OSError: If the file cannot be opened.
         """
+        self.filename = filename
+
         try:
-            with open(filename, "r") as file:
-                self.text_lines = file.readlines()
+            self._file = open(filename, "r") if file is None else file
 
         except FileNotFoundError:
             raise FileNotFoundError(f"File '{filename}' not found.")
@@ -77,84 +335,234 @@ class Functions:
         except PermissionError:
             raise PermissionError(f"Permission denied to open '{filename}'.")
 
-        except UnicodeDecodeError:
-            raise UnicodeDecodeError(f"File '{filename}' is not a text file.")
-
         except OSError as os_err:
             raise OSError(f"Error opening file '{filename}': {os_err}")
 
+        # Lines read since the last function was yielded, by index.
+        self._window = {}
+        self._line_idx = -1
+        self._functions = scan_functions(self._read_lines(), on_class)
+
+    def _read_lines(self):
+        for line_idx, line in enumerate(self._file):
+            self._window[line_idx] = line
+            self._line_idx = line_idx
+            yield line
+
+    def line(self, line_idx):
+        """
+        Returns a line of the file, as long as it belongs to the last
+        function yielded. Earlier lines are not kept.
+
+        Args:
+            line_idx (int): Index of the line in the file.
+
+        Returns:
+            str: Text of the line.
+
+        Raises:
+            KeyError: If the line is no longer (or not yet) available.
+        """
+        return self._window[line_idx]
+
     def __iter__(self):
         return self
 
     def __next__(self):
+        """
+        Raises:
+            StopIteration: If the end of the file is reached.
+            OSError: If the file cannot be read.
+        """
+        # The line that ended the last function may start the next one.
+        self._window = {line_idx: line
+                        for line_idx, line in self._window.items()
+                        if line_idx == self._line_idx}
 
         try:
-            text_lines = self.text_lines[self.from_idx:]
+            return next(self._functions)
 
-            start = "def "
-            end = ":"
-            text = "\n".join(text_lines)
+        except StopIteration:
+            self._file.close()
+            raise
 
-            declaration = (start
-                           + grab(text, start=start, end=end)
-                           + end).strip()
+        except UnicodeDecodeError:
+            self._file.close()
+            raise OSError(f"File '{self.filename}' is not a text file.")
 
-            first_idx = index_in_list(declaration, text_lines) + 1
+        except OSError as os_err:
+            self._file.close()
+            raise OSError(f"Error reading file '{self.filename}': {os_err}")
 
-            body = cut_function_body(text_lines[first_idx:])
 
-            function_name = grab(declaration,
-                                 start=start,
-                                 end="(")
+TRY_PATTERN = re.compile(r"try\s*:")
+CLAUSE_PATTERN = re.compile(r"(?:else|finally)\s*:|except\b")
 
-            processed_lines = (index_in_list(start, text_lines)
-                               + len(declaration.split("\n"))
-                               + len(body)
-                               + 1)
 
-            self.from_idx += processed_lines - 1
-            line_number = self.from_idx - len(body)
+def handler_names(clause):
+    """
+    Returns the exceptions caught by an except clause.
 
-            body = "\n".join(body)
+    Args:
+        clause (str): Line of the clause, like 'except (A, B) as err:'.
 
-            return line_number, function_name, body
+    Returns:
+        list:   Names of the exceptions. A bare 'except:' catches
+                'BaseException'.
+    """
+    code = remove_string_literals(f"{clause}\n").split("#", maxsplit=1)[0]
+    names = code.strip()[len("except"):].lstrip("* ").split(":")[0]
+    names = names.split(" as ", maxsplit=1)[0].strip(" ()")
 
-        except IndexError:
-            raise StopIteration
+    return [name.strip()
+            for name in names.split(",")
+            if name.strip()] or ["BaseException"]
 
 
 class TryExceptBlocks:
 
-    text_lines = ""
-    from_idx = 0
-
-    def __init__(self, body_text):
-        self.text_lines = body_text.split("\n")
+    def __init__(self, body_text, lines=None):
+        """
+        Finds the try-except blocks of a function body, nested ones
+        included, in a single pass over its lines.
 
-    def __iter__(self):
-        return self
+        The lines protected by each block (its try clause, not its except,
+        else and finally clauses) form intervals that are either nested or
+        disjoint. They split the body in segments, each one with the
+        exceptions handled by every block around it, so the handlers of a
+        line are found with a binary search.
 
-    def __next__(self):
+        Args:
+            body_text (str): Body of a function.
+            lines (LineTable):  Lines of the body, if already classified.
         """
-        Raises:
-            StopIteration: If the end of the file is reached.
+        # blocks = [(try_idx, start_idx, end_idx, handlers), ...]
+        # Lines start_idx to end_idx - 1 are protected by the handlers.
+        self.blocks = []
+
+        # open_blocks = [[indentation, try_idx, start_idx, end_idx,
+        #                 handlers], ...], innermost last.
+        open_blocks = []
+        brackets = 0
+        string_quotes = None
+        lines = LineTable(body_text) if lines is None else lines
+
+        for line_idx, line in enumerate(lines.lines):
+
+            # Lines inside triple-quoted strings and inside brackets do not
+            # open or close blocks.
+            if string_quotes is not None:
+                if line.count(string_quotes) % 2 == 1:
+                    string_quotes = None
+                continue
+
+            kind = lines.kinds[line_idx]
+            if kind & BLANK:
+                continue
+
+            # Comments can only open triple-quoted strings.
+            code = "" if kind & COMMENT else lines.clean_lines[line_idx]
+            if "#" in code:
+                code = code.split("#", maxsplit=1)[0]
+
+            continued = brackets > 0
+            brackets = max(0, brackets
+                           + sum(map(code.count, "([{"))
+                           - sum(map(code.count, ")]}")))
+
+            for quotes in ('"""', "'''"):
+                if line.count(quotes) % 2 == 1:
+                    string_quotes = quotes
+                    break
+
+            stripped = code.strip()
+            if continued or not stripped:
+                continue
+
+            indentation = lines.indentation[line_idx]
+            is_clause = CLAUSE_PATTERN.match(stripped) is not None
+
+            # Blocks end at the first line that is not indented inside of
+            # them and is not one of their clauses.
+            while open_blocks and (
+                    indentation < open_blocks[-1][0]
+                    or (indentation == open_blocks[-1][0] and not is_clause)):
+                self._close(open_blocks.pop(), line_idx)
+
+            if TRY_PATTERN.match(stripped):
+                rest = stripped.split(":", maxsplit=1)[1].strip()
+                start_idx = line_idx if rest else line_idx + 1
+                open_blocks.append([indentation, line_idx, start_idx,
+                                    None, []])
+
+            elif is_clause and open_blocks \
+                    and open_blocks[-1][0] == indentation:
+                block = open_blocks[-1]
+                if block[3] is None:
+                    block[3] = line_idx
+                if stripped.startswith("except"):
+                    block[4].extend(handler_names(stripped))
+
+        while open_blocks:
+            self._close(open_blocks.pop(), len(lines.lines))
+
+        self.blocks.sort()
+        self._segments()
+
+    def _close(self, block, line_idx):
+        _, try_idx, start_idx, end_idx, handlers = block
+        if end_idx is None:
+            end_idx = line_idx
+        if handlers and start_idx < end_idx:
+            self.blocks.append((try_idx, start_idx, end_idx, handlers))
+
+    def _segments(self):
         """
-        try:
-            text_lines = self.text_lines[self.from_idx:]
-
-            first_idx = index_in_list("try:", text_lines) + 1
-
-            body = cut_function_body(text_lines[first_idx:],
-                                     try_except_block=True)
-
-            processed_lines = first_idx + len(body)
+        Splits the body in segments at the start and end of every block,
+        and finds the exceptions handled in each one, sweeping the blocks
+        in order with a stack of the blocks around the current segment.
+        """
+        starts = {}
+        for block in self.blocks:
+            starts.setdefault(block[1], []).append(block)
+
+        # self._bounds[i] is the first line of segment i,
+        # self._handled[i] are the exceptions handled in it.
+        self._bounds = sorted({idx
+                               for _, start_idx, end_idx, _ in self.blocks
+                               for idx in (start_idx, end_idx)})
+        self._handled = []
+        stack = []
+
+        for bound in self._bounds:
+            while stack and stack[-1][2] <= bound:
+                stack.pop()
+
+            # Outer blocks (ending later) go first.
+            stack.extend(sorted(starts.get(bound, ()),
+                                key=lambda block: -block[2]))
+
+            self._handled.append(tuple(exc
+                                       for block in stack
+                                       for exc in block[3]))
+
+    def scope(self, line_idx):
+        """
+        Returns the segment of a line and the exceptions handled in it.
 
-            self.from_idx += processed_lines
-            line_number = self.from_idx - len(body) - 1
+        Args:
+            line_idx (int): Index of the line in the body.
 
-            body = text_lines[first_idx-1] + "\n" + "\n".join(body)
+        Returns:
+            tuple:  (segment, handled)
+                    segment is -1 for lines before the first block.
+                    handled = (exception_name, ...)
+        """
+        segment = bisect_right(self._bounds, line_idx) - 1
+        if segment < 0:
+            return segment, ()
 
-            return line_number, body
+        return segment, self._handled[segment]
 
-        except IndexError:
-            raise StopIteration
+    def __iter__(self):
+        return iter(self.blocks)
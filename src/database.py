@@ -4,12 +4,34 @@
 @author   Julio Cabria
 """
 
+from hashlib import sha256
+from types import MappingProxyType
+
+# Exceptions raised by calling built-in functions, by function name.
 BUILTIN_FUNCTIONS = {
-    'open(': ['FileNotFoundError', 'PermissionError'],
-    'int(': ['ValueError'],
-    'float(': ['ValueError'],
+    'open': ['FileNotFoundError', 'PermissionError'],
+    'int': ['ValueError'],
+    'float': ['ValueError'],
+    'complex': ['ValueError'],
+    'chr': ['ValueError'],
+    'ord': ['TypeError'],
+    'next': ['StopIteration'],
+    'input': ['EOFError'],
+    'getattr': ['AttributeError'],
+    'delattr': ['AttributeError'],
+    'divmod': ['ZeroDivisionError'],
+    'compile': ['SyntaxError'],
+    '__import__': ['ImportError'],
+    'bytes.fromhex': ['ValueError'],
+    'bytearray.fromhex': ['ValueError'],
 }
 
+# Exceptions raised by using operators, as (regex, exceptions) rules.
+OPERATOR_RULES = [
+    (r'//?', ['ZeroDivisionError']),
+    (r'\b\w+\[', ['IndexError']),
+]
+
 EXCEPTION_GROUPS = {
     'BaseExceptionGroup': 'BaseException',
     'GeneratorExit': 'BaseException',
@@ -80,27 +102,103 @@ EXCEPTION_GROUPS = {
 }
 
 
-def expand_groups(groups):
+# Identifies the contents of the tables above, as shipped. Results computed
+# with a different database are not reused.
+DATABASE_VERSION = sha256(repr((sorted(BUILTIN_FUNCTIONS.items()),
+                                OPERATOR_RULES,
+                                sorted(EXCEPTION_GROUPS.items())))
+                          .encode()).hexdigest()[:16]
+
+_DESCENDANTS = None
+
+
+def _descendants():
+    """
+    Returns the table of descendants of every exception group, computing it
+    from EXCEPTION_GROUPS the first time it is needed.
+
+    Returns:
+        mappingproxy:   Read-only table of descendants.
+                            table[group] = frozenset({group, exc, ...})
+    """
+    global _DESCENDANTS
+
+    if _DESCENDANTS is not None:
+        return _DESCENDANTS
+
+    children = {}
+    for exc, exc_group in EXCEPTION_GROUPS.items():
+        children.setdefault(exc_group, []).append(exc)
+
+    closure = {}
 
     def _expand_group(group):
-        exceptions = [group]
-        for exc, exc_group in EXCEPTION_GROUPS.items():
+        if group not in closure:
+            closure[group] = frozenset({group}.union(
+                *(_expand_group(exc) for exc in children.get(group, ()))))
+        return closure[group]
+
+    for group in children:
+        _expand_group(group)
+
+    _DESCENDANTS = MappingProxyType(closure)
+    return _DESCENDANTS
+
 
-            if exc_group != group:
-                continue
-            exceptions.append(exc)
+def register_exception(exc, exc_group="Exception"):
+    """
+    Adds a user-defined exception to the exception hierarchy.
+
+    Args:
+        exc (str): Name of the exception.
+        exc_group (str): Name of the group the exception belongs to.
+
+    Raises:
+        ValueError: If the exception would become a group of itself.
+    """
+    global _DESCENDANTS
+
+    if EXCEPTION_GROUPS.get(exc) == exc_group:
+        return
+
+    if exc_group in expand_groups({exc}):
+        raise ValueError(f"'{exc}' cannot belong to '{exc_group}', "
+                         f"'{exc_group}' already belongs to '{exc}'.")
+
+    EXCEPTION_GROUPS[exc] = exc_group
+    _DESCENDANTS = None
+
+
+def unregister_exception(exc):
+    """
+    Removes a user-defined exception from the exception hierarchy. The
+    exceptions that belong to it are left as they are.
+
+    Args:
+        exc (str): Name of the exception.
+    """
+    global _DESCENDANTS
+
+    if EXCEPTION_GROUPS.pop(exc, None) is not None:
+        _DESCENDANTS = None
+
+
+def expand_groups(groups):
+    """
+    Returns the exceptions in the given groups, including the groups
+    themselves.
 
-            if exc not in EXCEPTION_GROUPS.values():
-                continue
-            exceptions.extend(_expand_group(exc))
+    Args:
+        groups (iterable): Names of exceptions or exception groups.
 
-        return exceptions
+    Returns:
+        set: Names of the exceptions in the groups.
+    """
+    descendants = _descendants()
 
-    return {exc
-            for group
-            in groups
-            for exc
-            in _expand_group(group)}
+    return set().union(*(descendants.get(group, (group,))
+                         for group
+                         in groups))
 
 
 def exception_list():
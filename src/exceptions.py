@@ -4,15 +4,35 @@
 @author   Julio Cabria
 """
 
+from collections import ChainMap
+from hashlib import blake2b
 from code_parsing import Functions
 from code_parsing import TryExceptBlocks
+from graphs import strongly_connected_components
 from string_utils import grab
 from string_utils import get_doctring
-from string_utils import remove_string_literals
+from string_utils import shortened
 from database import expand_groups
 from database import exception_list
-from operators import operator_excs
-from functions import function_excs
+from line_table import LineTable
+from line_table import BLANK
+from line_table import CALL
+from line_table import COLON
+from line_table import COMMENT
+from operators import OPERATOR_PATTERN
+from operators import matched_operator_excs
+from functions import CALL_PATTERN
+from functions import call_names
+from functions import called_function_excs
+from functions import matched_call_names
+from functions import ExceptionNames
+from functions import called_exceptions
+from functions import called_function
+from functions import exception_names
+from functions import typed_call
+from functions import variable_type
+from occurrences import OccurrenceStore
+from symbols import SymbolTable
 
 
 def documented_exceptions(docstring):
@@ -35,33 +55,74 @@ def documented_exceptions(docstring):
                           if exc in docstring})
 
 
-def not_handled(raised, caught):
+def line_exceptions(clean_line, calls=None, operators=None):
     """
-    Returns the exceptions not handled by the try-except blocks.
-    Reads EXCEPTION_GROUPS from database.py
+    Returns the exceptions raised by a line of code on its own, that is,
+    by built-in and library functions, operators and raise statements.
 
     Args:
-        raised (dict):  Exceptions raised in the text.
-                            dict[exception_name]=line_idx
-        caught (dict):  Exceptions caught in the text.
-                            dict[exception_name]=line_idx
+        clean_line (str): Line of code, without string literals.
+        calls (list):   Functions called in the line, see
+                        functions.call_names(). Found if None.
+        operators (list):   Matches of operators.OPERATOR_PATTERN in the
+                            line. Found if None.
 
     Returns:
-        dict:   Exceptions not handled by the try-except blocks.
-                    dict[exception_name]=line_idx
-                An exception is considered handled if it is in 'caught'
-                or if a group it belongs to is in 'caught'.
+        list: Names of the exceptions, in order.
     """
+    if calls is None:
+        calls = call_names(clean_line)
+
+    if operators is None:
+        operators = OPERATOR_PATTERN.finditer(clean_line)
+
+    # Most lines call nothing and use no operators.
+    excs = ((called_function_excs(calls) if calls else [])
+            + (matched_operator_excs(operators) if operators else []))
+
+    if "raise " not in clean_line:
+        return excs
+
     try:
-        handled = expand_groups(caught.keys())
+        exception = grab(clean_line, start="raise ", end="\n").strip()
+    except IndexError:
+        return excs
+
+    exception_name = exception.split("(", maxsplit=1)[0]
+    exception_name = exception_name.split("#", maxsplit=1)[0].strip()
+    return excs + [exception_name]
 
-    except KeyError:
-        handled = set()
 
-    return {exc: line_idx
-            for exc, line_idx
-            in raised.items()
-            if exc not in handled}
+def code_lines(lines):
+    """
+    Yields the lines of code of a text, with the functions they call and
+    the exceptions they raise on their own. Calls and operators are found
+    scanning the whole text once.
+
+    Args:
+        lines (LineTable): Lines of the text.
+
+    Yields:
+        tuple:  (line_idx, kind, clean_line, calls, excs)
+                Comments and blank lines are skipped.
+                kind = LineTable.kinds[line_idx]
+                calls = [fun_name, ...], see functions.call_names().
+                excs = [exception_name, ...], see line_exceptions().
+    """
+    line_calls = lines.line_matches(CALL_PATTERN)
+    line_operators = lines.line_matches(OPERATOR_PATTERN)
+
+    for line_idx, kind in enumerate(lines.kinds):
+
+        if kind & (BLANK | COMMENT):
+            continue
+
+        clean_line = lines.clean_lines[line_idx]
+        calls = matched_call_names(line_calls.get(line_idx, ()))
+        excs = line_exceptions(clean_line, calls,
+                               line_operators.get(line_idx, ()))
+
+        yield line_idx, kind, clean_line, calls, excs
 
 
 def raised_exceptions(text, fun_dict=None):
@@ -71,167 +132,330 @@ def raised_exceptions(text, fun_dict=None):
     Args:
         text (str): Phython code as a string.
         fun_dict (dict): Dictionary of functions.
-            fun_dict[fun_name] = {exception_name: line_idx, ...}
+            fun_dict[fun_name] = [(exception_name, line_idx), ...]
 
     Returns:
-        dict: Exceptions raised in the text.
-              dict[exception_name]=line_idx
+        list:   Every occurrence of the exceptions raised in the text, in
+                line order, each one once.
+                [(exception_name, line_idx), ...]
     """
     fun_dict = fun_dict or {}
     excs = {}
 
-    for line_idx, line in enumerate(text.split("\n")):
+    for line_idx, _, _, calls, line_excs in code_lines(LineTable(text)):
 
-        if line.lstrip().startswith("#"):
-            continue
+        # Implicit exceptions (built-in functions and operators) and
+        # explicit exceptions (manually raised)
+        excs.update(dict.fromkeys((exc, line_idx) for exc in line_excs))
 
-        line = f"{line}\n"
-        clean_line = remove_string_literals(line)
+        # Implicit exceptions (user-defined functions)
+        excs.update(dict.fromkeys((exc, line_idx)
+                                  for fun_name
+                                  in calls
+                                  for exc
+                                  in called_exceptions(fun_name, fun_dict)))
 
-        # Implicit exceptions (python built-in functions)
-        excs.update({exc: line_idx
-                     for exc
-                     in function_excs(clean_line)})
+    return list(excs)
 
-        # Implicit exceptions (python built-in operators
-        excs.update({exc: line_idx
-                     for exc
-                     in operator_excs(clean_line)})
 
-        # Implicit exceptions (user-defined functions)
-        excs.update({exc: line_idx
-                     for funct_call
-                     in (fun_excs
-                         for fun_name, fun_excs
-                         in fun_dict.items()
-                         if f"{fun_name}(" in clean_line
-                         and f"def {fun_name}" not in clean_line)
-                     for exc, _
-                     in funct_call})
-
-        # Explicit exceptions (manually raised)
-        try:
-            exception = grab(clean_line, start="raise ", end="\n").strip()
-        except IndexError:
+def function_summary(fun_body):
+    """
+    Returns the exceptions a function raises by itself and the functions it
+    calls. Unlike its exception table, the summary of a function does not
+    depend on the rest of the file, so it can be reused while the body of
+    the function does not change.
+
+    Args:
+        fun_body (str): Body of the function.
+
+    Returns:
+        list:   Regions of the function, in order: lines where the same
+                exceptions are handled, by the try-except blocks around
+                them. Line indexes are relative to the line before the body.
+                [(excs, calls, caught), ...]
+                excs = [(exception_name, line_idx), ...]
+                calls = [(fun_name, line_idx), ...]
+                caught = [exception_name, ...]
+                Methods called on local variables of a known class are
+                named after the class, like 'Class.method'.
+    """
+    lines = LineTable(fun_body)
+    blocks = TryExceptBlocks(fun_body, lines)
+    regions = {}
+    # Classes of the local variables, to resolve the methods called on them.
+    variable_types = {}
+
+    for line_idx, kind, clean_line, called, excs in code_lines(lines):
+
+        calls = [typed_call(fun_name, variable_types) for fun_name in called]
+
+        # Only lines with a colon or a call can annotate or assign one.
+        if kind & (CALL | COLON):
+            type_hint = variable_type(clean_line)
+            if type_hint is not None:
+                variable_types[type_hint[0]] = type_hint[1]
+
+        if not excs and not calls:
             continue
 
-        exception_name = exception.split("(", maxsplit=1)[0]
-        exception_name = exception_name.split("#", maxsplit=1)[0]
-        excs[exception_name] = line_idx
+        segment, handled = blocks.scope(line_idx)
+        region_excs, region_calls, _ = regions.setdefault(
+            segment, ([], [], list(handled)))
+
+        region_excs.extend((exc, line_idx+1) for exc in dict.fromkeys(excs))
+        region_calls.extend((fun_name, line_idx+1) for fun_name in calls)
 
-    return excs
+    return [regions[segment] for segment in sorted(regions)]
 
 
-def caught_exceptions(text):
+def resolve_summary(fun_idx, summary, fun_names):
     """
-    Returns the exceptions caught in the text.
+    Returns the exceptions raised by a function, given its summary and the
+    exceptions raised by the functions it may call.
 
     Args:
-        text (str): Phython code as a string.
+        fun_idx (int): Index of the line before the body of the function.
+        summary (list): Summary of the function, see function_summary().
+        fun_names (dict):   Names of the exceptions raised by each function,
+                            in order, like functions.ExceptionNames.
+            fun_names[fun_name] = (exception_name, ...)
 
     Returns:
-        dict: Exceptions caught in the text.
-              dict[exception_name]=line_idx
+        list:   Every occurrence of the exceptions raised by the function,
+                in line order. A call raises each exception of the called
+                function once, at the line of the call.
+                [(exception_name, line_idx), ...]
     """
     excs = {}
 
-    for line_idx, line in enumerate(text.split("\n")):
-
-        if line.lstrip().startswith("#"):
-            continue
-
-        try:
-            exception = grab(line, start="except ", end=":").strip()
-            if exception.strip() == "":
-                exception = "unnamed exception"
+    for region_excs, calls, caught in summary:
+        handled = expand_groups(caught)
 
-        except IndexError:
-            continue
+        excs.update(dict.fromkeys((exc, fun_idx+line_idx)
+                                  for exc, line_idx in region_excs
+                                  if exc not in handled))
 
-        excs[exception] = line_idx
+        excs.update(dict.fromkeys((exc, fun_idx+line_idx)
+                                  for fun_name, line_idx in calls
+                                  for exc
+                                  in called_function(fun_name, fun_names)
+                                  if exc not in handled))
 
-    return excs
+    return sorted(excs, key=lambda x: x[1])
 
 
-def function_exception_table(filename):
+def resolve_calls(summary, fun_name, symbols):
     """
-    Returns a table of functions and the exceptions they raise.
+    Returns the summary of a function with the calls to functions of the
+    file named by their qualified name. The other calls are left as
+    written.
 
     Args:
-        filename (str): Path to the file.
+        summary (list): Summary of the function, see function_summary().
+        fun_name (str): Qualified name of the function.
+        symbols (SymbolTable): Symbol table of the file.
 
     Returns:
-        tuple:  (fun_dict, documented_dict)
-                fun_dict[fun_name] = {exception_name: line_idx, ...}
-                documented_dict[fun_name] = {exception_name, ...}
+        list: Summary of the function.
+    """
+    return [(excs,
+             [(symbols.resolve(callee, fun_name) or callee, line_idx)
+              for callee, line_idx in calls],
+             caught)
+            for excs, calls, caught in summary]
 
-    Raises:
-        OSError: If the file cannot be opened for any reason.
+
+def propagate_exceptions(functions, imported=None, symbols=None):
     """
-    def _search_outside(fun_idx,
-                        fun_body,
-                        fun_dict,
-                        try_except_boundaries):
+    Resolves the summaries of the functions of a file, so that each
+    function raises the exceptions of the functions it calls, wherever they
+    are defined in the file. Recursive and mutually recursive functions are
+    resolved to a fixed point.
 
-        excs_in_body = {exc: fun_idx+line_idx+1
-                        for exc, line_idx
-                        in raised_exceptions(fun_body, fun_dict).items()}
+    The call graph is split into strongly connected components, which are
+    resolved once each, callees first. Inside a component, a worklist keeps
+    track of the functions whose callees changed, so only those are
+    resolved again.
 
-        for start, end in try_except_boundaries:
-            excs_in_body = {exc: line
-                            for exc, line
-                            in excs_in_body.items()
-                            if line not in range(start, end)}
+    Args:
+        functions (list): [(fun_idx, fun_name, summary), ...] in file order,
+                          see function_summary().
+        imported (dict): Functions defined in other modules, by name.
+            imported[fun_name] = [(exception_name, line_idx), ...]
+        symbols (SymbolTable):  Classes of the file, to resolve calls to
+                                methods. The functions are added to it.
 
-        return excs_in_body
+    Returns:
+        list:   Exceptions raised by each function, in the same order.
+                [[(exception_name, line_idx), ...], ...]
+    """
+    imported = {} if imported is None else imported
+    symbols = SymbolTable() if symbols is None else symbols
+
+    # A name refers to its last definition in the file.
+    for idx, (_, fun_name, _) in enumerate(functions):
+        symbols.add_function(fun_name, idx)
+
+    functions = [(fun_idx, fun_name, resolve_calls(summary, fun_name, symbols))
+                 for fun_idx, fun_name, summary in functions]
+
+    graph = {}
+    callers = {idx: [] for idx in range(len(functions))}
+    for idx, (_, fun_name, summary) in enumerate(functions):
+        graph[idx] = list(dict.fromkeys(
+            symbols.functions[callee]
+            for _, calls, _ in summary
+            for callee, _ in calls
+            if callee in symbols.functions
+            and symbols.functions[callee] != idx))
+        for callee_idx in graph[idx]:
+            callers[callee_idx].append(idx)
+
+    results = [[] for _ in functions]
+    # Callers only read the names of the exceptions of their callees, so
+    # they are resolved again only when those change.
+    names = [() for _ in functions]
+    resolved = set()
+    current = {fun_name: () for fun_name in symbols.functions}
+    known_functions = ChainMap({}, current, ExceptionNames(imported))
+
+    for component in strongly_connected_components(graph):
+        members = set(component)
+        worklist = list(reversed(component))
+        queued = set(component)
+
+        while worklist:
+            idx = worklist.pop()
+            queued.discard(idx)
+            fun_idx, fun_name, summary = functions[idx]
+
+            # Recursive calls do not add anything new.
+            known_functions.maps[0] = {fun_name: ()}
+            results[idx] = resolve_summary(fun_idx, summary, known_functions)
+            result_names = exception_names(results[idx])
+
+            if idx in resolved and result_names == names[idx]:
+                continue
+
+            resolved.add(idx)
+            names[idx] = result_names
+            if symbols.functions[fun_name] == idx:
+                current[fun_name] = result_names
+
+            for caller_idx in callers[idx]:
+                if caller_idx in members and caller_idx not in queued:
+                    worklist.append(caller_idx)
+                    queued.add(caller_idx)
+
+    return results
+
+
+def summary_lines(summary):
+    """
+    Returns the lines of a function where the exceptions of its summary
+    may be reported, relative to the line before the body.
+
+    Args:
+        summary (list): Summary of the function, see function_summary().
+
+    Returns:
+        set: Line indexes.
+    """
+    return {line_idx
+            for excs, calls, _ in summary
+            for _, line_idx in (*excs, *calls)}
 
-    def _search_inside(fun_idx, fun_body, fun_dict):
 
-        excs_to_return = {}
-        try_except_boundaries = []
+def function_fingerprint(fun_body):
+    """
+    Returns the key of the summary of a function in a memo, see
+    function_exception_table().
 
-        for try_idx, try_body in TryExceptBlocks(fun_body):
-            start_line = try_idx + fun_idx + 1
-            end_line = try_idx + fun_idx + len(try_body.strip().split('\n'))
+    Args:
+        fun_body (str): Body of the function.
 
-            try_except_boundaries.append((start_line, end_line))
+    Returns:
+        str: Fingerprint of the body.
+    """
+    return blake2b(fun_body.encode(), digest_size=16).hexdigest()
 
-            excs_inside = {exc: start_line+line_idx
-                           for exc, line_idx
-                           in not_handled(
-                               raised_exceptions(try_body, fun_dict),
-                               caught_exceptions(try_body)).items()}
 
-            excs_to_return.update(excs_inside)
+def function_exception_table(filename, memo=None, imported=None,
+                             previews=None, file=None):
+    """
+    Returns a table of functions and the exceptions they raise. Methods
+    are named after their class, like 'Class.method'.
 
-        return try_except_boundaries, excs_to_return
+    Args:
+        filename (str): Path to the file.
+        memo (dict):    Summaries of a previous run, keyed by fingerprint of
+                        the function body. Functions whose body did not
+                        change are not analysed again. It is updated to hold
+                        the summaries of this run only.
+        imported (dict):    Functions defined in other modules, by the name
+                            they are called with in this file.
+            imported[fun_name] = [(exception_name, line_idx), ...]
+        previews (dict):    If given, it is filled with the lines where
+                            exceptions may be reported, as they are read,
+                            so the file does not have to be read again to
+                            show them. Only these lines are kept in memory.
+            previews[line_number] = line_text
+        file (io.TextIOBase):   Open text file to read instead of opening
+                                filename, see code_parsing.Functions.
 
-# def function_exception_table(filename, fun_dict):
+    Returns:
+        tuple:  (fun_dict, documented_dict)
+                fun_dict is an occurrences.OccurrenceStore, read like
+                fun_dict[fun_name] = [(exception_name, line_idx), ...]
+                documented_dict[fun_name] = {exception_name, ...}
 
+    Raises:
+        OSError: If the file cannot be opened for any reason.
+    """
     fun_dict = {}
     documented_dict = {}
+    functions = []
+    summaries = {}
+    memo = {} if memo is None else memo
+
+    # Exceptions defined in the file are only known while it is analysed.
+    symbols = SymbolTable()
+    try:
+        functions_iter = Functions(filename, on_class=symbols.add_class,
+                                   file=file)
+
+        for fun_idx, fun_name, fun_body in functions_iter:
+
+            fingerprint = function_fingerprint(fun_body)
+
+            if fingerprint in memo:
+                summary, documented = memo[fingerprint]
+
+            else:
+                summary = function_summary(fun_body)
+                documented = documented_exceptions(get_doctring(fun_body))
 
-    for fun_idx, fun_name, fun_body in Functions(filename):
+            if previews is not None:
+                previews.update({fun_idx+line_idx:
+                                 shortened(functions_iter
+                                           .line(fun_idx+line_idx-1).strip())
+                                 for line_idx in summary_lines(summary)})
 
-        # Undocumented exceptions
-        excs_for_fun = {}
+            summaries[fingerprint] = summary, documented
+            functions.append((fun_idx, fun_name, summary))
+            documented_dict[fun_name] = documented
 
-        try_except_boundaries, inside_excs = _search_inside(fun_idx,
-                                                            fun_body,
-                                                            fun_dict)
-        excs_for_fun.update(inside_excs)
+        memo.clear()
+        memo.update(summaries)
 
-        outside_excs = _search_outside(fun_idx,
-                                       fun_body,
-                                       fun_dict,
-                                       try_except_boundaries)
-        excs_for_fun.update(outside_excs)
+        # Calls are resolved again on every run, so callers see the changes
+        # in the exceptions of the functions they call.
+        results = propagate_exceptions(functions, imported, symbols)
 
-        fun_dict[fun_name] = sorted(excs_for_fun.items(),
-                                    key=lambda x: x[1])
+    finally:
+        symbols.unregister_exceptions()
 
-        # Documented exceptions
-        docstring_text = get_doctring(fun_body)
-        documented_dict[fun_name] = documented_exceptions(docstring_text)
+    for (_, fun_name, _), result in zip(functions, results):
+        fun_dict[fun_name] = result
 
-    return fun_dict, documented_dict
+    return OccurrenceStore(fun_dict), documented_dict
@@ -0,0 +1,179 @@
+"""
+@file     formats.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import json
+import os
+from string_utils import cyan
+from string_utils import file_report_str
+from string_utils import REPORT_HINT
+
+
+SARIF_SCHEMA = ("https://docs.oasis-open.org/sarif/sarif/v2.1.0/errata01/"
+                "os/schemas/sarif-schema-2.1.0.json")
+
+SARIF_RULE = {
+    "id": "uncaught-exception",
+    "name": "UncaughtException",
+    "shortDescription": {
+        "text": "Exception neither handled nor documented.",
+    },
+    "helpUri": "https://github.com/Julynx/exception-control",
+}
+
+
+def reported_exceptions(fun_table, documented_table):
+    """
+    Returns the exceptions of a file that are not documented by the
+    function that raises them.
+
+    Args:
+        fun_table (OccurrenceStore): Exceptions raised by each function.
+        documented_table (dict): documented_table[fun_name] = {exc, ...}
+
+    Yields:
+        tuple: (fun_name, exception_name, line), in file order.
+    """
+    for fun_name in fun_table:
+        for exc_line, exc_names in fun_table.grouped(
+                fun_name, documented_table.get(fun_name, ())):
+            for exc_name in exc_names:
+                yield fun_name, exc_name, exc_line
+
+
+def write_text(results, out, previews=None):
+    """
+    Writes the colored report, one file at a time, as the results arrive.
+
+    Args:
+        results (iterable): (filename, fun_table, documented_table, error)
+                            for each file, see runner.analyze_file().
+        out (file): Where to write the report.
+        previews (dict):    Previews of the lines of the files, by filename,
+                            see string_utils.functions_str(). The files not
+                            in it are read again to show their lines.
+    """
+    previews = {} if previews is None else previews
+    found = False
+
+    for result in results:
+        text = file_report_str(*result, previews.pop(result[0], None))
+        if text:
+            found = True
+            out.write(text)
+            out.flush()
+
+    out.write(cyan(REPORT_HINT) + "\n" if found
+              else "\n---- No uncaught exceptions ----\n\n")
+
+
+def write_jsonl(results, out, previews=None):
+    """
+    Writes a JSON object per uncaught exception, or per file that could not
+    be analysed, flushing them as soon as each file is done.
+
+        {"file": ..., "function": ..., "exception": ..., "line": ...}
+        {"file": ..., "error": ...}
+
+    Args:
+        results (iterable): (filename, fun_table, documented_table, error)
+                            for each file, see runner.analyze_file().
+        out (file): Where to write the records.
+        previews (dict): Unused, lines are not included in the records.
+    """
+    for filename, fun_table, documented_table, error in results:
+
+        if error:
+            out.write(json.dumps({"file": filename, "error": error}) + "\n")
+
+        for fun_name, exc_name, exc_line in reported_exceptions(
+                fun_table, documented_table):
+            out.write(json.dumps({"file": filename,
+                                  "function": fun_name,
+                                  "exception": exc_name,
+                                  "line": exc_line}) + "\n")
+
+        out.flush()
+
+
+def _artifact_uri(filename):
+    # Only needed by SARIF logs, and slow to import.
+    from pathlib import Path
+    from urllib.parse import quote
+
+    if os.path.isabs(filename):
+        return Path(filename).as_uri()
+
+    return quote(filename.replace(os.sep, "/"))
+
+
+def _sarif_result(filename, fun_name, exc_name, exc_line):
+    return {
+        "ruleId": SARIF_RULE["id"],
+        "level": "warning",
+        "message": {
+            "text": f"'{exc_name}' may be raised by '{fun_name}' and is "
+                    f"neither handled nor documented.",
+        },
+        "locations": [{
+            "physicalLocation": {
+                "artifactLocation": {"uri": _artifact_uri(filename)},
+                "region": {"startLine": exc_line},
+            },
+            "logicalLocations": [{"name": fun_name, "kind": "function"}],
+        }],
+    }
+
+
+def write_sarif(results, out, previews=None):
+    """
+    Writes a SARIF 2.1.0 log, for code scanning dashboards. Results are
+    written as each file is done, and the files that could not be analysed
+    are listed as notifications once every file is done.
+
+    Args:
+        results (iterable): (filename, fun_table, documented_table, error)
+                            for each file, see runner.analyze_file().
+        out (file): Where to write the log.
+        previews (dict): Unused, lines are not included in the log.
+    """
+    tool = {"driver": {"name": "exception-control",
+                       "informationUri": SARIF_RULE["helpUri"],
+                       "rules": [SARIF_RULE]}}
+
+    out.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", '
+              f'"runs": [{{"tool": {json.dumps(tool)}, "results": [')
+
+    notifications = []
+    separator = "\n"
+
+    for filename, fun_table, documented_table, error in results:
+
+        if error:
+            notifications.append({
+                "level": "error",
+                "message": {"text": error},
+                "locations": [{"physicalLocation": {"artifactLocation": {
+                    "uri": _artifact_uri(filename)}}}],
+            })
+
+        for reported in reported_exceptions(fun_table, documented_table):
+            out.write(separator + json.dumps(_sarif_result(filename,
+                                                           *reported)))
+            separator = ",\n"
+
+        out.flush()
+
+    invocation = {"executionSuccessful": not notifications,
+                  "toolExecutionNotifications": notifications}
+
+    out.write(f'\n], "invocations": [{json.dumps(invocation)}]}}]}}\n')
+
+
+FORMATS = {
+    "text": write_text,
+    "jsonl": write_jsonl,
+    "sarif": write_sarif,
+}
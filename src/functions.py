@@ -5,20 +5,212 @@
 """
 
 import re
+from collections.abc import Mapping
+from keyword import iskeyword
+from database import BUILTIN_FUNCTIONS
+from signatures import signature_excs
 
 
-def function_excs(line):
+CALL_PATTERN = re.compile(r"(?<!def )\b((?:\w+\.)*\w+)\(")
 
-    excs = []
+# Annotated variables (x: Class) and variables assigned the result of a
+# call (x = Class(...)), with or without annotation.
+TYPE_HINT_PATTERN = re.compile(
+    r"^\s*(\w+)\s*(?::\s*([\w.]+)\s*)?(?:=\s*([\w.]+)\()?")
 
-    if re.search(r'[(\s]open\(', line):
-        excs.append("FileNotFoundError")
-        excs.append("PermissionError")
+# Receivers that refer to the class of the method they are used in.
+SELF_NAMES = {"self", "cls"}
 
-    if re.search(r'[(\s]int\(', line):
-        excs.append("ValueError")
 
-    if re.search(r'[(\s]float\(', line):
-        excs.append("ValueError")
+def known_function_excs(fun_name):
+    """
+    Returns the exceptions raised by a built-in function, or by a standard
+    library or third-party function called by its qualified name, like
+    'json.loads'.
 
-    return excs
+    Args:
+        fun_name (str): Name of the function, as returned by call_names().
+
+    Returns:
+        list: Names of the exceptions, empty if the function is unknown.
+    """
+    if fun_name in BUILTIN_FUNCTIONS:
+        return BUILTIN_FUNCTIONS[fun_name]
+
+    if "." in fun_name:
+        return signature_excs(fun_name)
+
+    return ()
+
+
+def called_function_excs(fun_names):
+    """
+    Returns the exceptions raised by the known functions among the ones
+    called in a line.
+
+    Args:
+        fun_names (iterable): Names of the functions, see call_names().
+
+    Returns:
+        list: Names of the exceptions, in order and without repetitions.
+    """
+    return list(dict.fromkeys(exc
+                              for fun_name in fun_names
+                              for exc in known_function_excs(fun_name)))
+
+
+def call_names(line):
+    """
+    Returns the names of the functions called in a line, in order and
+    without repetitions. Function declarations are not calls. Names are
+    returned as written, including the module or object they are called
+    on, like 'module.function'.
+
+    Args:
+        line (str): Line of code, without string literals.
+
+    Returns:
+        list: Names of the functions called.
+    """
+    return list(dict.fromkeys(CALL_PATTERN.findall(line)))
+
+
+def matched_call_names(matches):
+    """
+    Returns the names of the functions called in a line, like call_names().
+
+    Args:
+        matches (iterable): Matches of CALL_PATTERN in the line.
+
+    Returns:
+        list: Names of the functions called.
+    """
+    return list(dict.fromkeys(match.group(1) for match in matches))
+
+
+def variable_type(line):
+    """
+    Returns the class of the variable a line annotates or assigns an
+    instance to, like 'x: Class' or 'x = Class(...)'. The called function
+    is taken for a class, whether it is one or not.
+
+    Args:
+        line (str): Line of code, without string literals.
+
+    Returns:
+        tuple: (variable, class_name), or None if there is no type hint.
+    """
+    match = TYPE_HINT_PATTERN.match(line)
+    if match is None:
+        return None
+
+    variable, annotation, called = match.groups()
+    if iskeyword(variable) or not (annotation or called):
+        return None
+
+    return variable, annotation or called
+
+
+def typed_call(fun_name, variable_types):
+    """
+    Replaces the receiver of a method call by its class, if it is known.
+
+    Args:
+        fun_name (str): Name of the function, as returned by call_names().
+        variable_types (dict): variable_types[variable] = class_name
+
+    Returns:
+        str: Name like 'Class.method' for 'variable.method', or fun_name.
+    """
+    receiver, _, name = fun_name.rpartition(".")
+    if receiver not in variable_types:
+        return fun_name
+
+    return f"{variable_types[receiver]}.{name}"
+
+
+def called_function(fun_name, fun_dict):
+    """
+    Returns the exceptions raised by a called function. A name like
+    'module.function' is looked up as is first, then as 'function', except
+    for methods called on self or cls, that are never plain functions.
+
+    Args:
+        fun_name (str): Name of the function, as returned by call_names().
+        fun_dict (dict): Dictionary of functions.
+            fun_dict[fun_name] = [(exception_name, line_idx), ...]
+
+    Returns:
+        list:   [(exception_name, line_idx), ...], empty if the function is
+                not in fun_dict.
+    """
+    if fun_name in fun_dict:
+        return fun_dict[fun_name]
+
+    if fun_name.split(".", maxsplit=1)[0] in SELF_NAMES:
+        return ()
+
+    return fun_dict.get(fun_name.rsplit(".", maxsplit=1)[-1], ())
+
+
+def called_exceptions(fun_name, fun_dict):
+    """
+    Returns the exceptions raised by a called function, without the lines
+    they are raised at, as called_function() finds it.
+
+    Args:
+        fun_name (str): Name of the function, as returned by call_names().
+        fun_dict (dict): Dictionary of functions.
+            fun_dict[fun_name] = [(exception_name, line_idx), ...]
+
+    Returns:
+        list: Names of the exceptions, in order and without repetitions.
+    """
+    return list(exception_names(called_function(fun_name, fun_dict)))
+
+
+def exception_names(occurrences):
+    """
+    Returns the names of the exceptions of a list of occurrences.
+
+    Args:
+        occurrences (list): [(exception_name, line_idx), ...]
+
+    Returns:
+        tuple: Names of the exceptions, in order and without repetitions.
+    """
+    return tuple(dict.fromkeys(exc for exc, _ in occurrences))
+
+
+class ExceptionNames(Mapping):
+    """
+    Names of the exceptions raised by each function of a dictionary of
+    functions, worked out the first time each function is looked up, so
+    that calls to it do not scan its occurrences again.
+
+    Reads like:
+        names[fun_name] = (exception_name, ...)
+    """
+
+    def __init__(self, fun_dict):
+        """
+        Args:
+            fun_dict (dict): Dictionary of functions.
+                fun_dict[fun_name] = [(exception_name, line_idx), ...]
+        """
+        self.fun_dict = fun_dict
+        self._names = {}
+
+    def __getitem__(self, fun_name):
+        if fun_name not in self._names:
+            self._names[fun_name] = exception_names(self.fun_dict[fun_name])
+        return self._names[fun_name]
+
+    def __iter__(self):
+        return iter(self.fun_dict)
+
+    def __len__(self):
+        return len(self.fun_dict)
+
+    def __contains__(self, fun_name):
+        return fun_name in self.fun_dict
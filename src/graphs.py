@@ -0,0 +1,69 @@
+"""
+@file     graphs.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+
+def strongly_connected_components(graph):
+    """
+    Returns the strongly connected components of a directed graph, using
+    an iterative version of Tarjan's algorithm, in linear time.
+
+    Args:
+        graph (dict): graph[node] = iterable of the nodes it points to.
+                      Nodes only present as targets are ignored.
+
+    Returns:
+        list:   Components, as lists of nodes. A component comes after every
+                component it points to, so dependencies come first.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, targets = work[-1]
+
+            for target in targets:
+                if target not in graph:
+                    continue
+
+                if target not in index:
+                    index[target] = lowlink[target] = len(index)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(graph[target])))
+                    break
+
+                if target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
+
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
@@ -0,0 +1,88 @@
+"""
+@file     line_table.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+from array import array
+from bisect import bisect_right
+from string_utils import remove_string_literals
+
+
+# Kinds of line, as bit flags of LineTable.kinds.
+BLANK = 1
+COMMENT = 2
+# Has an opening parenthesis outside string literals, so it may call
+# functions or assign their result.
+CALL = 4
+# Has a colon outside string literals, so it may annotate a variable.
+COLON = 8
+
+
+class LineTable:
+
+    def __init__(self, text):
+        """
+        Classifies the lines of a text, like the body of a function, in a
+        single pass, so that every stage of its analysis reads the kind,
+        indentation and code of each line instead of working them out again.
+
+        Args:
+            text (str): Lines of Python code.
+        """
+        self.lines = text.split("\n")
+
+        # Attributes of each line, by index.
+        self.kinds = array("B")
+        self.indentation = array("L")
+        # Lines without string literals, ending in a newline, and their
+        # offsets in self.code, all of them together. Comments and blank
+        # lines are left empty.
+        self.clean_lines = []
+        self.offsets = array("L")
+        offset = 0
+
+        for line in self.lines:
+            stripped = line.lstrip()
+
+            if not stripped:
+                kind = BLANK
+                clean_line = "\n"
+
+            elif stripped.startswith("#"):
+                kind = COMMENT
+                clean_line = "\n"
+
+            else:
+                clean_line = remove_string_literals(f"{line}\n")
+                kind = ((CALL if "(" in clean_line else 0)
+                        | (COLON if ":" in clean_line else 0))
+
+            self.kinds.append(kind)
+            self.indentation.append(len(line) - len(stripped))
+            self.clean_lines.append(clean_line)
+            self.offsets.append(offset)
+            offset += len(clean_line)
+
+        self.code = "".join(self.clean_lines)
+
+    def line_matches(self, pattern):
+        """
+        Returns the matches of a pattern in the code of the lines, scanning
+        it once instead of line by line. The pattern must not match across
+        lines.
+
+        Args:
+            pattern (re.Pattern): Compiled regular expression.
+
+        Returns:
+            dict: matches[line_idx] = [match, ...], in order.
+        """
+        matches = {}
+        offsets = self.offsets
+
+        for match in pattern.finditer(self.code):
+            line_idx = bisect_right(offsets, match.start()) - 1
+            matches.setdefault(line_idx, []).append(match)
+
+        return matches
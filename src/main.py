@@ -6,28 +6,347 @@
 @author   Julio Cabria
 """
 
+import argparse
+import os
 import sys
-from exceptions import function_exception_table
+import time
+from runner import ENGINES
+from runner import python_files
+from runner import stream_files
+from runner import analyze_files
+from cache import ResultCache
+from cache import DEFAULT_CACHE_DIR
+from signatures import use_signatures
+from string_utils import use_color
+from string_utils import use_line_cache
+from string_utils import line_cache_info
+from string_utils import LINE_CACHE_SIZE
 from string_utils import table_str
+from string_utils import report_str
+from formats import FORMATS
+from formats import write_jsonl
 
 
-def main():
+COLOR_MODES = {"auto": None, "always": True, "never": False}
+
+
+def parse_args():
+    """
+    Parses the command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        usage="python3 main.py [options] <path> [<path> ...]")
+
+    parser.add_argument("paths",
+                        nargs="*",
+                        metavar="path",
+                        help="Python files or directories to analyse")
+    parser.add_argument("--engine",
+                        choices=ENGINES.keys(),
+                        default="lines",
+                        help="analysis engine to use (default: lines)")
+    parser.add_argument("-j", "--jobs",
+                        type=int,
+                        default=None,
+                        help="number of processes (default: number of CPUs)")
+    parser.add_argument("--cache-dir",
+                        default=DEFAULT_CACHE_DIR,
+                        help=f"result cache directory "
+                             f"(default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="analyse every file, ignoring the result cache")
+    parser.add_argument("--clear-cache",
+                        action="store_true",
+                        help="empty the result cache before analysing")
+    parser.add_argument("--format",
+                        choices=FORMATS.keys(),
+                        default="text",
+                        help="report format, JSON Lines and SARIF are "
+                             "written as each file is done (default: text)")
+    parser.add_argument("--color",
+                        choices=COLOR_MODES.keys(),
+                        default="auto",
+                        help="color the text report, auto only does it for "
+                             "terminals (default: auto)")
+    parser.add_argument("--signatures",
+                        metavar="FILE",
+                        help="signature database of library functions "
+                             "(default: the one shipped in src/)")
+    parser.add_argument("--stream",
+                        action="store_true",
+                        help="read each file once, keeping only the lines "
+                             "shown in the report (implied for pipes)")
+    parser.add_argument("--project",
+                        action="store_true",
+                        help="analyse the paths as one project, following "
+                             "calls to functions imported from other files")
+    parser.add_argument("--changed-since",
+                        metavar="REF",
+                        help="only report the functions changed since a git "
+                             "commit, analysing only the files they are in")
+    parser.add_argument("--staged",
+                        action="store_true",
+                        help="only report the functions changed in the git "
+                             "index, like --changed-since")
+    parser.add_argument("--watch",
+                        action="store_true",
+                        help="keep running and report files as they change")
+    parser.add_argument("--interval",
+                        type=float,
+                        default=1.0,
+                        help="seconds between checks in --watch mode "
+                             "(default: 1)")
+
+    parser.add_argument("--profile",
+                        action="store_true",
+                        help="time each stage of the analysis, in a single "
+                             "process and without the cache")
+    parser.add_argument("--profile-top",
+                        type=int,
+                        default=10,
+                        metavar="N",
+                        help="slowest files and functions shown by "
+                             "--profile (default: 10)")
+    parser.add_argument("--profile-pstats",
+                        metavar="FILE",
+                        help="write cProfile statistics, implies --profile")
+    parser.add_argument("--profile-trace",
+                        metavar="FILE",
+                        help="write a Chrome trace of the stages, implies "
+                             "--profile")
+    parser.add_argument("--line-cache",
+                        type=int,
+                        default=LINE_CACHE_SIZE,
+                        metavar="N",
+                        help=f"cleaned lines kept in memory by each process, "
+                             f"0 to disable (default: {LINE_CACHE_SIZE})")
+    parser.add_argument("--line-cache-stats",
+                        action="store_true",
+                        help="print the hits and misses of the line cache, "
+                             "analysing in a single process and without the "
+                             "result cache")
+
+    args = parser.parse_args()
+    args.profile = bool(args.profile or args.profile_pstats
+                        or args.profile_trace)
+    args.changed = args.changed_since is not None or args.staged
+
+    # Changes are looked for in the current directory by default.
+    if not args.paths and args.changed:
+        args.paths = ["."]
+
+    if not args.paths and not args.clear_cache:
+        parser.error("the following arguments are required: path")
+
+    if args.project and args.engine != "lines":
+        parser.error("--project is only supported by the lines engine")
+
+    if args.stream and (args.engine != "lines" or args.project or args.watch):
+        parser.error("--stream is only supported by the lines engine, "
+                     "without --project or --watch")
+
+    if args.watch and args.profile:
+        parser.error("--profile is not supported with --watch")
+
+    if args.watch and args.line_cache_stats:
+        parser.error("--line-cache-stats is not supported with --watch")
+
+    if args.line_cache < 0:
+        parser.error("--line-cache must be 0 or more")
+
+    if args.watch and args.changed:
+        parser.error("--changed-since and --staged are not supported with "
+                     "--watch")
+
+    if args.watch and args.format == "sarif":
+        parser.error("--format=sarif is not supported with --watch")
+
+    # Pipes, like <(cat *.py), cannot be read twice.
+    if args.engine == "lines" and not (args.project or args.watch):
+        args.stream = args.stream or any(os.path.exists(path)
+                                         and not os.path.isfile(path)
+                                         and not os.path.isdir(path)
+                                         for path in args.paths)
+
+    return args
+
+
+def watch_paths(args):
+    """
+    Prints a report every time the watched files change, until interrupted.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+    """
+    # Only loaded when watching, so that regular runs do not pay for it.
+    from watch import watch
 
     try:
-        filename = sys.argv[1]
+        for results in watch(args.paths,
+                             engine=args.engine,
+                             interval=args.interval):
+            if args.format == "jsonl":
+                write_jsonl(results, sys.stdout)
+                continue
+
+            print(f"\n[{time.strftime('%H:%M:%S')}] "
+                  f"{len(results)} file(s) analysed")
+            print(report_str(results), flush=True)
+
+    except KeyboardInterrupt:
+        pass
+
+
+def report_paths(args):
+    """
+    Analyses the paths and prints their report.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+    """
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    previews = {}
+
+    if args.changed:
+        # Only loaded when needed, so that regular runs do not pay for it.
+        from changes import changed_files
+        from changes import changed_results
+
+        try:
+            changed = changed_files(args.paths, args.changed_since,
+                                    args.staged)
+        except OSError as os_err:
+            sys.exit(f"Error: {os_err}")
+
+    # Unchanged files are not even listed, unless --project needs them to
+    # follow calls.
+    filenames = (list(changed) if args.changed and not args.project
+                 else python_files(args.paths))
 
-    except IndexError:
-        print("\nUsage: python3 main.py <filename>\n")
-        sys.exit(1)
+    if args.project:
+        from project import analyze_project
+        results = analyze_project(args.paths, cache_dir=cache_dir)
+
+    elif args.stream:
+        results = stream_files(filenames, previews)
+
+    else:
+        results = analyze_files(filenames,
+                                engine=args.engine,
+                                jobs=args.jobs,
+                                cache_dir=cache_dir)
+
+    if args.changed:
+        results = changed_results(results, changed)
 
     try:
-        table, documented = function_exception_table(filename)
-        table_txt = table_str(filename, table, documented)
+        # A single file keeps the plain report, without file headers.
+        if (args.format == "text" and not (args.project or args.changed)
+                and len(filenames) == 1):
+            filename, table, documented, error = next(results)
+            print(f"\n{error}\n" if error
+                  else table_str(filename, table, documented,
+                                 previews.get(filename)), flush=True)
+            return
+
+        FORMATS[args.format](results, sys.stdout, previews)
+
+    # The reader of the report (like head) stopped reading it.
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def profile_paths(args):
+    """
+    Analyses the paths and prints their report, like report_paths(), then
+    prints how long each stage of the analysis took to stderr. Files are
+    analysed in this process and without the cache, so that every stage
+    is timed.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+    """
+    # Only loaded when profiling, so that regular runs do not pay for it.
+    import cProfile
+    from profiling import Profiler
+
+    args.jobs = 1
+    args.no_cache = True
+
+    profiler = Profiler(trace=args.profile_trace is not None)
+    stats = cProfile.Profile() if args.profile_pstats else None
+
+    profiler.install()
+    if stats is not None:
+        stats.enable()
+
+    try:
+        report_paths(args)
+
+    finally:
+        if stats is not None:
+            stats.disable()
+        profiler.uninstall()
+
+    print(profiler.summary(args.profile_top), file=sys.stderr)
+
+    if stats is not None:
+        stats.dump_stats(args.profile_pstats)
+
+    if args.profile_trace is not None:
+        profiler.write_trace(args.profile_trace)
+
+
+def print_line_cache_stats():
+    """
+    Prints the hits and misses of the cache of cleaned lines to stderr.
+    """
+    hits, misses, maxsize, currsize = line_cache_info()
+    ratio = hits / (hits + misses) if hits + misses else 0
+
+    print(f"\nLine cache: {hits} hits, {misses} misses ({ratio:.1%} hit "
+          f"rate), {currsize}/{maxsize} lines", file=sys.stderr)
+
+
+def main():
+
+    args = parse_args()
+
+    if args.clear_cache:
+        ResultCache(args.cache_dir).clear()
+        if not args.paths:
+            return
+
+    if args.signatures:
+        try:
+            use_signatures(args.signatures)
+        except OSError as os_err:
+            sys.exit(f"Error: {os_err}")
+
+    use_color(COLOR_MODES[args.color])
+    use_line_cache(args.line_cache)
+
+    if args.watch:
+        watch_paths(args)
+        return
+
+    # Every line is cleaned in this process, so that every line is counted.
+    if args.line_cache_stats:
+        args.jobs = 1
+        args.no_cache = True
 
-    except OSError:
-        table_txt = f"\nFile '{filename}' not found.\n"
+    if args.profile:
+        profile_paths(args)
+    else:
+        report_paths(args)
 
-    print(table_txt)
+    if args.line_cache_stats:
+        print_line_cache_stats()
 
 
 if __name__ == "__main__":
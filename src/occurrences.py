@@ -0,0 +1,109 @@
+"""
+@file     occurrences.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+
+
+class OccurrenceStore(Mapping):
+    """
+    Every occurrence of the exceptions raised by the functions of a file,
+    stored in parallel array columns. Exception names are interned and
+    replaced by their index, and the occurrences of each function are
+    contiguous, so an occurrence takes 8 bytes instead of a tuple.
+
+    Reads like the dict it is built from:
+        store[fun_name] = [(exception_name, line_idx), ...]
+    """
+
+    __slots__ = ("_names", "_ids", "_functions", "_starts", "_excs",
+                 "_lines")
+
+    def __init__(self, table=None):
+        """
+        Args:
+            table (dict):   Occurrences of each function, sorted by line.
+                table[fun_name] = [(exception_name, line_idx), ...]
+        """
+        self._names = []
+        self._ids = {}
+        self._functions = {}
+
+        # The occurrences of the i-th function are the ones from
+        # _starts[i] to _starts[i+1] in the _excs and _lines columns.
+        self._starts = array("I", [0])
+        self._excs = array("I")
+        self._lines = array("I")
+
+        for fun_name, occurrences in (table or {}).items():
+            self._functions[fun_name] = len(self._functions)
+
+            for exc, line_idx in occurrences:
+                if exc not in self._ids:
+                    self._ids[exc] = len(self._names)
+                    self._names.append(sys.intern(exc))
+                self._excs.append(self._ids[exc])
+                self._lines.append(line_idx)
+
+            self._starts.append(len(self._excs))
+
+    def _range(self, fun_name):
+        idx = self._functions[fun_name]
+        return range(self._starts[idx], self._starts[idx + 1])
+
+    def __getitem__(self, fun_name):
+        names, excs, lines = self._names, self._excs, self._lines
+        return [(names[excs[idx]], lines[idx])
+                for idx in self._range(fun_name)]
+
+    def __iter__(self):
+        return iter(self._functions)
+
+    def __len__(self):
+        return len(self._functions)
+
+    def __contains__(self, fun_name):
+        return fun_name in self._functions
+
+    def grouped(self, fun_name, exclude=()):
+        """
+        Returns the occurrences of a function grouped by line.
+
+        Args:
+            fun_name (str): Name of the function.
+            exclude (set): Exceptions to leave out, like documented ones.
+
+        Yields:
+            tuple: (line_idx, [exception_name, ...]), in line order.
+        """
+        names, excs, lines = self._names, self._excs, self._lines
+        line_idx, group = None, []
+
+        for idx in self._range(fun_name):
+            exc = names[excs[idx]]
+            if exc in exclude:
+                continue
+
+            if lines[idx] != line_idx and group:
+                yield line_idx, group
+                group = []
+
+            line_idx = lines[idx]
+            group.append(exc)
+
+        if group:
+            yield line_idx, group
+
+    def nbytes(self):
+        """
+        Returns the size of the occurrence columns, in bytes.
+
+        Returns:
+            int: Bytes used by the columns.
+        """
+        return sum(column.itemsize * len(column)
+                   for column in (self._starts, self._excs, self._lines))
@@ -5,16 +5,30 @@
 """
 
 import re
+from database import OPERATOR_RULES
 
 
-def operator_excs(line):
+# Every rule is a named group of a single pattern, so a line is scanned once
+# whatever the number of rules. Several lines can be scanned at once, with
+# '^' and '$' matching at the start and end of each one.
+OPERATOR_PATTERN = re.compile("|".join(f"(?P<rule{idx}>{pattern})"
+                                       for idx, (pattern, _)
+                                       in enumerate(OPERATOR_RULES)),
+                              re.MULTILINE)
 
-    excs = []
 
-    if re.search(r'//?', line):
-        excs.append("ZeroDivisionError")
+def matched_operator_excs(matches):
+    """
+    Returns the exceptions raised by the operators matched in a line.
 
-    if re.search(r'\b\w+\[', line):
-        excs.append("IndexError")
+    Args:
+        matches (iterable): Matches of OPERATOR_PATTERN in the line.
 
-    return excs
+    Returns:
+        list: Names of the exceptions, in rule order and without repetitions.
+    """
+    matched = {int(match.lastgroup[len("rule"):]) for match in matches}
+
+    return list(dict.fromkeys(exc
+                              for idx in sorted(matched)
+                              for exc in OPERATOR_RULES[idx][1]))
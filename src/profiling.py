@@ -0,0 +1,256 @@
+"""
+@file     profiling.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from functools import wraps
+from importlib import import_module
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Functions timed as stages, as (module, attribute, stage, per_function).
+# The self time of per_function stages is added to the function being
+# analysed when they run.
+STAGES = [
+    ("exceptions", "function_exception_table", "analysis", False),
+    ("ast_engine", "function_exception_table", "analysis", False),
+    ("code_parsing", "Functions.__next__", "scan", False),
+    ("code_parsing", "TryExceptBlocks.__init__", "try_blocks", True),
+    ("line_table", "LineTable.__init__", "line_table", True),
+    ("exceptions", "function_summary", "summary", True),
+    ("exceptions", "line_exceptions", "raised", True),
+    ("functions", "call_names", "calls", True),
+    ("functions", "matched_call_names", "calls", True),
+    ("exceptions", "documented_exceptions", "docstrings", True),
+    ("line_table", "LineTable.line_matches", "regex_checks", True),
+    ("database", "expand_groups", "hierarchy", True),
+    ("ast_engine", "function_summary", "ast_visit", True),
+    ("ast_engine", "_BodyVisitor.visit", "ast_visit", True),
+    ("exceptions", "propagate_exceptions", "propagation", False),
+    ("string_utils", "functions_str", "report", False),
+]
+
+# Stages recorded as events of the Chrome trace. The others are called
+# once per line or per node, too often to be shown one by one.
+TRACED = {"analysis", "scan", "summary", "docstrings", "propagation",
+          "report"}
+
+_MISSING = object()
+
+
+class Profiler:
+
+    def __init__(self, trace=False):
+        """
+        Initializes the Profiler object. Nothing is timed until install()
+        is called.
+
+        Args:
+            trace (bool): Whether to record the events of a Chrome trace.
+        """
+        self.trace = trace
+        self.events = []
+
+        # stages[stage] = [calls, total_time, self_time, peak_memory]
+        self.stages = {}
+        # files[filename] = [time, peak_memory]
+        self.files = {}
+        # functions[(filename, fun_name)] = time
+        self.functions = {}
+
+        self._stack = []
+        self._file = None
+        self._function = None
+        self._patched = []
+        self._origin = time.perf_counter()
+
+    def install(self):
+        """
+        Replaces the stage functions by timed ones, in the modules that
+        define them and in every module that imported them.
+        """
+        tracemalloc.start()
+
+        self_module = sys.modules[__name__]
+        replacements = {}
+
+        for module_name, attribute, stage, per_function in STAGES:
+            owner = import_module(module_name)
+            *path, name = attribute.split(".")
+            for part in path:
+                owner = getattr(owner, part)
+
+            # Inherited methods, like NodeVisitor.visit, are overridden.
+            original = getattr(owner, name)
+            timed = self._timed(original, stage, per_function)
+            self._set(owner, name, vars(owner).get(name, _MISSING), timed)
+            replacements[id(original)] = timed
+
+        for module in list(sys.modules.values()):
+            filename = getattr(module, "__file__", None) or ""
+            if os.path.dirname(filename) != SRC_DIR or module is self_module:
+                continue
+
+            for name, value in list(vars(module).items()):
+                if id(value) in replacements:
+                    self._set(module, name, value, replacements[id(value)])
+
+                # Tables of functions, by name.
+                elif isinstance(value, dict):
+                    for key, item in list(value.items()):
+                        if id(item) in replacements:
+                            self._set(value, key, item,
+                                      replacements[id(item)])
+
+    def uninstall(self):
+        """
+        Restores the functions replaced by install().
+        """
+        for owner, name, original in reversed(self._patched):
+            if isinstance(owner, dict):
+                owner[name] = original
+            elif original is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+        self._patched = []
+        tracemalloc.stop()
+
+    def _set(self, owner, name, original, timed):
+        self._patched.append((owner, name, original))
+        if isinstance(owner, dict):
+            owner[name] = timed
+        else:
+            setattr(owner, name, timed)
+
+    def _timed(self, function, stage, per_function):
+        profiler = self
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            profiler._enter(stage, args)
+            result = None
+            try:
+                result = function(*args, **kwargs)
+                return result
+            finally:
+                profiler._exit(stage, per_function, result)
+
+        return timed
+
+    def _enter(self, stage, args):
+
+        # Stages that set the file or function later stages belong to.
+        if stage == "analysis" and not any(frame[0] == "analysis"
+                                           for frame in self._stack):
+            self._file = args[0]
+            self._function = None
+
+        elif stage == "propagation":
+            self._function = None
+
+        elif stage == "ast_visit" and args and isinstance(args[0], str):
+            self._function = args[0]
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][4] = max(self._stack[-1][4], peak)
+        tracemalloc.reset_peak()
+
+        # [stage, start, child_time, entry_memory, child_peak]
+        self._stack.append([stage, time.perf_counter(), 0.0, current, 0])
+
+    def _exit(self, stage, per_function, result):
+        end = time.perf_counter()
+        _, start, child_time, entry_memory, child_peak = self._stack.pop()
+        elapsed = end - start
+        self_time = elapsed - child_time
+
+        peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+            self._stack[-1][4] = max(self._stack[-1][4], peak)
+
+        # Recursive calls are part of the total time of the outer call.
+        outermost = not any(frame[0] == stage for frame in self._stack)
+
+        stats = self.stages.setdefault(stage, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed if outermost else 0.0
+        stats[2] += self_time
+        stats[3] = max(stats[3], peak - entry_memory)
+
+        if stage == "analysis" and outermost:
+            file_stats = self.files.setdefault(self._file, [0.0, 0])
+            file_stats[0] += elapsed
+            file_stats[1] = max(file_stats[1], peak - entry_memory)
+
+        elif stage == "scan" and isinstance(result, tuple):
+            self._function = result[1]
+
+        if per_function and self._function is not None:
+            key = (self._file, self._function)
+            self.functions[key] = self.functions.get(key, 0.0) + self_time
+
+        if self.trace and stage in TRACED:
+            self.events.append({
+                "name": stage,
+                "cat": "stage",
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {"file": self._file, "function": self._function},
+            })
+
+    def summary(self, top=10):
+        """
+        Returns a summary of the stages, and of the slowest files and
+        functions.
+
+        Args:
+            top (int): Number of files and functions to show.
+
+        Returns:
+            str: Summary.
+        """
+        lines = [f"\n{'stage':<14} {'calls':>10} {'total (ms)':>11} "
+                 f"{'self (ms)':>10} {'peak (KiB)':>11}"]
+        for stage, (calls, total, self_time, peak) in sorted(
+                self.stages.items(), key=lambda item: -item[1][2]):
+            lines.append(f"{stage:<14} {calls:>10} {total*1000:>11.2f} "
+                         f"{self_time*1000:>10.2f} {peak/1024:>11.1f}")
+
+        lines.append(f"\nSlowest {top} files:")
+        for filename, (elapsed, peak) in sorted(
+                self.files.items(), key=lambda item: -item[1][0])[:top]:
+            lines.append(f"{elapsed*1000:>10.2f} ms {peak/1024:>10.1f} KiB  "
+                         f"{filename}")
+
+        lines.append(f"\nSlowest {top} functions:")
+        for (filename, fun_name), elapsed in sorted(
+                self.functions.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"{elapsed*1000:>10.2f} ms  {filename}: {fun_name}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_trace(self, filename):
+        """
+        Writes the recorded events as a Chrome trace, to be opened with
+        chrome://tracing or https://ui.perfetto.dev.
+
+        Args:
+            filename (str): Path to the trace.
+        """
+        with open(filename, "w") as file:
+            json.dump({"traceEvents": self.events,
+                       "displayTimeUnit": "ms"}, file)
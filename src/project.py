@@ -0,0 +1,324 @@
+"""
+@file     project.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import re
+from collections import ChainMap
+from collections.abc import Mapping
+from exceptions import function_exception_table
+from graphs import strongly_connected_components
+from runner import python_files
+from cache import ResultCache
+
+
+IMPORT_PATTERN = re.compile(r"^\s*import\s+(.+)$")
+FROM_IMPORT_PATTERN = re.compile(r"^\s*from\s+(\.*)([\w.]*)\s+import\s+(.+)$")
+
+# Modules in a circular import are analysed again until their tables stop
+# changing, at most this many times.
+MAX_ITERATIONS = 10
+
+
+def module_name(filename, root):
+    """
+    Returns the name a file is imported with, relative to a root directory.
+
+    Args:
+        filename (str): Path to the file.
+        root (str): Directory the modules are imported from.
+
+    Returns:
+        str: Name of the module, like 'package.module'.
+    """
+    path = os.path.splitext(os.path.relpath(filename, root))[0]
+    parts = [part for part in path.split(os.sep) if part not in ("", ".")]
+
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+
+    return ".".join(parts)
+
+
+def _imported_names(names):
+    """
+    Returns the names imported by an import statement.
+
+    Args:
+        names (str): Text after 'import', like 'a, b as c'.
+
+    Returns:
+        list: [(name, alias), ...]
+    """
+    names = names.split("#", maxsplit=1)[0].strip(" ()\\\n")
+
+    imported = []
+    for name in names.split(","):
+        parts = name.split()
+        if not parts:
+            continue
+        alias = parts[2] if len(parts) == 3 and parts[1] == "as" else parts[0]
+        imported.append((parts[0], alias))
+
+    return imported
+
+
+def module_imports(lines, module, is_package=False):
+    """
+    Returns the imports of a module.
+
+    Args:
+        lines (iterable): Lines of the module.
+        module (str): Name of the module, to resolve relative imports.
+        is_package (bool): Whether the module is the __init__ of a package.
+
+    Returns:
+        list:   [(local_name, module, name), ...]
+                name is None for 'import module [as local_name]' and '*'
+                for 'from module import *'.
+    """
+    imports = []
+    statement = ""
+
+    for line in lines:
+
+        # Parenthesized imports can take several lines.
+        if statement:
+            statement += " " + line.strip()
+            if ")" not in line:
+                continue
+            line, statement = statement, ""
+
+        elif "import" in line and "(" in line and ")" not in line:
+            statement = line.strip()
+            continue
+
+        match = FROM_IMPORT_PATTERN.match(line)
+        if match:
+            dots, from_module, names = match.groups()
+
+            if dots:
+                package = module.split(".")
+                if not is_package:
+                    package = package[:-1]
+                package = package[:len(package) - len(dots) + 1]
+                from_module = ".".join(package + [from_module]).strip(".")
+
+            imports.extend((alias, from_module, name)
+                           for name, alias in _imported_names(names))
+            continue
+
+        match = IMPORT_PATTERN.match(line)
+        if match:
+            imports.extend((alias, name, None)
+                           for name, alias in _imported_names(match.group(1)))
+
+    return imports
+
+
+class ImportedFunctions(Mapping):
+    """
+    Functions a module imports from the other modules of the project, by
+    the name they are called with in the module. Names are resolved when
+    they are looked up, so importing a module does not copy its functions.
+    """
+
+    def __init__(self, imports, tables, modules):
+        """
+        Args:
+            imports (list): Imports of the module, see module_imports().
+            tables (dict):  tables[module] = functions available in each
+                            analysed module, see exported_functions().
+            modules (dict): modules[module] = filename, for the modules of
+                            the project.
+        """
+        self.tables = tables
+        self.modules = {}
+        self.functions = {}
+        self.star_modules = []
+
+        for local_name, module, name in imports:
+            if name is None:
+                self.modules[local_name] = module
+            elif name == "*":
+                self.star_modules.append(module)
+            elif f"{module}.{name}" in modules:
+                self.modules[local_name] = f"{module}.{name}"
+            else:
+                self.functions[local_name] = module, name
+
+    def __getitem__(self, fun_name):
+        if fun_name in self.functions:
+            module, name = self.functions[fun_name]
+            return self.tables.get(module, {})[name]
+
+        module, _, name = fun_name.rpartition(".")
+        if module in self.modules:
+            return self.tables.get(self.modules[module], {})[name]
+
+        # Methods of imported classes, like 'Class.method', imported by
+        # name or from an imported module, like 'module.Class.method'.
+        head, _, rest = fun_name.partition(".")
+        if rest and head in self.functions:
+            module, name = self.functions[head]
+            return self.tables.get(module, {})[f"{name}.{rest}"]
+
+        if rest and head in self.modules:
+            return self.tables.get(self.modules[head], {})[rest]
+
+        for module in self.star_modules:
+            if fun_name in self.tables.get(module, {}):
+                return self.tables[module][fun_name]
+
+        raise KeyError(fun_name)
+
+    def __iter__(self):
+        return (fun_name
+                for fun_name in self.functions
+                if fun_name in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def exported_functions(fun_dict, imported):
+    """
+    Returns the functions other modules can import from a module: the ones
+    it defines and the ones it imports by name, as in
+    'from package import function'.
+
+    Args:
+        fun_dict (dict): Functions defined in the module.
+        imported (ImportedFunctions): Functions imported by the module.
+
+    Returns:
+        ChainMap: exported[fun_name] = [(exception_name, line_idx), ...]
+    """
+    return ChainMap(fun_dict, dict(imported))
+
+
+def project_exception_tables(filenames, roots, memos=None):
+    """
+    Analyses the files of a project together, following the calls to
+    functions imported from other files of the project.
+
+    Modules are analysed after the modules they import, and the modules
+    in a circular import are analysed again until their results stop
+    changing, so each module is analysed a bounded number of times.
+
+    Args:
+        filenames (list): Paths to the files.
+        roots (dict): roots[filename] = directory the file is imported from.
+        memos (dict): memos[filename] = function summaries of the file, see
+                      exceptions.function_exception_table(). Updated in
+                      place. If None, summaries are only kept for this run.
+
+    Returns:
+        list:   (filename, fun_dict, documented_dict, error) for each file,
+                in the same order as filenames, like runner.analyze_files().
+    """
+    memos = {} if memos is None else memos
+    # Files are imported by module name, and when several files have the
+    # same name, like two roots with a util.py, the first one is imported.
+    # The others are still analysed, by filename.
+    modules = {}
+    names = {}
+    imports = {}
+    errors = {}
+
+    for filename in filenames:
+        module = module_name(filename, roots[filename])
+        modules.setdefault(module, filename)
+        names[filename] = module
+
+        try:
+            with open(filename, "r") as file:
+                imports[filename] = module_imports(
+                    file, module,
+                    os.path.basename(filename) == "__init__.py")
+
+        except FileNotFoundError:
+            imports[filename] = []
+            errors[filename] = f"File '{filename}' not found."
+
+        except (OSError, UnicodeDecodeError):
+            imports[filename] = []
+            errors[filename] = f"File '{filename}' could not be read."
+
+    graph = {filename: list(dict.fromkeys(
+                 modules[imported_module]
+                 for _, from_module, name in imports[filename]
+                 for imported_module in (from_module, f"{from_module}.{name}")
+                 if imported_module in modules))
+             for filename in imports}
+
+    tables = {}
+    results = {}
+
+    for component in strongly_connected_components(graph):
+        for _ in range(MAX_ITERATIONS):
+            changed = False
+
+            for filename in component:
+                if filename in errors:
+                    continue
+
+                imported = ImportedFunctions(imports[filename], tables,
+                                             modules)
+                result = function_exception_table(
+                    filename,
+                    memos.setdefault(filename, {}),
+                    imported)
+
+                changed |= results.get(filename) != result
+                results[filename] = result
+
+                module = names[filename]
+                if modules[module] == filename:
+                    tables[module] = exported_functions(result[0], imported)
+
+            if not changed or len(component) == 1:
+                break
+
+    return [(filename, {}, {}, errors[filename])
+            if filename in errors
+            else (filename, *results[filename], None)
+            for filename in filenames]
+
+
+def analyze_project(paths, cache_dir=None):
+    """
+    Analyses the Python files in the given paths as a single project. Each
+    directory is the root its files are imported from, and each file given
+    directly is imported from its own directory.
+
+    Args:
+        paths (list): Paths to files or directories.
+        cache_dir (str):    Directory of the result cache, where function
+                            summaries are reused from. If None, the cache is
+                            not used.
+
+    Returns:
+        list:   (filename, fun_dict, documented_dict, error) for each file,
+                like runner.analyze_files().
+    """
+    roots = {}
+    for path in paths:
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+        for filename in python_files([path]):
+            roots.setdefault(filename, root)
+
+    cache = ResultCache(cache_dir) if cache_dir else None
+    memos = {filename: cache.get_memo(filename) if cache else {}
+             for filename in roots}
+
+    results = project_exception_tables(list(roots), roots, memos)
+
+    if cache is not None:
+        for filename, memo in memos.items():
+            cache.put_memo(filename, memo)
+        cache.evict()
+
+    return results
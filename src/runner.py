@@ -0,0 +1,201 @@
+"""
+@file     runner.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+from importlib import import_module
+from itertools import repeat
+from exceptions import function_exception_table
+from cache import ResultCache
+
+
+# Modules of the engines, each with its own function_exception_table().
+# They are only imported when used, the ast engine being the slowest to
+# import.
+ENGINES = {
+    "lines": "exceptions",
+    "ast": "ast_engine",
+}
+
+
+def engine_table(engine):
+    """
+    Returns the function that analyses a file with the given engine.
+
+    Args:
+        engine (str): Name of the engine, a key of ENGINES.
+
+    Returns:
+        callable: function_exception_table() of the engine.
+    """
+    return import_module(ENGINES[engine]).function_exception_table
+
+
+def python_files(paths):
+    """
+    Returns the Python files in the given paths. Directories are searched
+    recursively, skipping hidden directories and __pycache__.
+
+    Args:
+        paths (list): Paths to files or directories.
+
+    Returns:
+        list: Paths to the files, without repetitions.
+    """
+    filenames = []
+
+    for path in paths:
+
+        if not os.path.isdir(path):
+            filenames.append(path)
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(dirname
+                             for dirname in dirs
+                             if not dirname.startswith(".")
+                             and dirname != "__pycache__")
+
+            filenames.extend(os.path.join(root, filename)
+                             for filename in sorted(files)
+                             if filename.endswith(".py"))
+
+    return list(dict.fromkeys(filenames))
+
+
+def analyze_file(filename, engine="lines", cache_dir=None, memo=None,
+                 previews=None):
+    """
+    Analyses a file, catching the errors that prevent its analysis.
+
+    Args:
+        filename (str): Path to the file.
+        engine (str): Name of the engine to use, a key of ENGINES.
+        cache_dir (str): Directory of the result cache. If None, the cache
+                         is not used.
+        memo (dict):    Function summaries of the previous analysis of the
+                        file, see exceptions.function_exception_table().
+                        If None, they are loaded from the cache.
+        previews (dict):    If given, the file is read only once, with the
+                            line engine and without the cache, and the
+                            lines to show in its report are stored here.
+                            See exceptions.function_exception_table().
+
+    Returns:
+        tuple:  (filename, fun_dict, documented_dict, error)
+                error is None if the file was analysed, or a message
+                explaining why it could not be analysed.
+    """
+    # Pipes and other special files can only be read once.
+    cache = (ResultCache(cache_dir)
+             if cache_dir and previews is None and os.path.isfile(filename)
+             else None)
+
+    try:
+        if cache is not None:
+            with open(filename, "rb") as file:
+                key = cache.key(file.read(), engine)
+
+            cached = cache.get(key)
+            if cached is not None:
+                return filename, *cached, None
+
+        if previews is not None:
+            table, documented = function_exception_table(filename, memo,
+                                                         previews=previews)
+
+        # Only the functions that changed since the last analysis of the
+        # file are analysed again by the line engine.
+        elif memo is not None and engine == "lines":
+            table, documented = function_exception_table(filename, memo)
+
+        elif cache is not None and engine == "lines":
+            memo = cache.get_memo(filename)
+            table, documented = function_exception_table(filename, memo)
+            cache.put_memo(filename, memo)
+
+        else:
+            table, documented = engine_table(engine)(filename)
+
+    except FileNotFoundError:
+        return filename, {}, {}, f"File '{filename}' not found."
+
+    except OSError as os_err:
+        return filename, {}, {}, str(os_err)
+
+    except SyntaxError as syntax_err:
+        return (filename, {}, {},
+                f"File '{filename}' could not be parsed: {syntax_err}")
+
+    if cache is not None:
+        cache.put(key, table, documented)
+
+    return filename, table, documented, None
+
+
+def stream_files(filenames, previews):
+    """
+    Analyses several files one after the other, reading each of them only
+    once, with the line engine and without the cache.
+
+    Args:
+        filenames (list): Paths to the files.
+        previews (dict):    Filled with the lines to show in the report of
+                            each file, by filename, before its result is
+                            yielded. See analyze_file().
+
+    Yields:
+        tuple:  (filename, fun_dict, documented_dict, error) for each file,
+                in the same order as filenames. See analyze_file().
+    """
+    for filename in filenames:
+        previews[filename] = {}
+        yield analyze_file(filename, previews=previews[filename])
+
+
+def analyze_files(filenames, engine="lines", jobs=None, cache_dir=None):
+    """
+    Analyses several files in parallel, using a pool of processes.
+
+    Args:
+        filenames (list): Paths to the files.
+        engine (str): Name of the engine to use, a key of ENGINES.
+        jobs (int): Number of processes. Defaults to the number of CPUs.
+                    With a single job or a single file, the files are
+                    analysed in the current process.
+        cache_dir (str): Directory of the result cache. If None, the cache
+                         is not used. Otherwise, unchanged files are not
+                         analysed again and the cache is trimmed to its
+                         maximum size once every file is done.
+
+    Yields:
+        tuple:  (filename, fun_dict, documented_dict, error) for each file,
+                in the same order as filenames. See analyze_file().
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(filenames))
+
+    if jobs <= 1:
+        yield from map(analyze_file,
+                       filenames,
+                       repeat(engine),
+                       repeat(cache_dir))
+
+    else:
+        # Only loaded when needed, it takes longer to import than to
+        # analyse a small file.
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(filenames) // (jobs * 8))
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(analyze_file,
+                                    filenames,
+                                    repeat(engine),
+                                    repeat(cache_dir),
+                                    chunksize=chunksize)
+
+    if cache_dir:
+        ResultCache(cache_dir).evict()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+
+"""
+@file     server.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import traceback
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from code_parsing import scan_functions
+from exceptions import documented_exceptions
+from exceptions import function_exception_table
+from exceptions import function_fingerprint
+from exceptions import function_summary
+from exceptions import resolve_calls
+from exceptions import resolve_summary
+from formats import reported_exceptions
+from functions import ExceptionNames
+from occurrences import OccurrenceStore
+from string_utils import get_doctring
+from symbols import SymbolTable
+
+
+SERVER_NAME = "exception-control"
+
+# Seconds without changes to a document before it is analysed again.
+DEFAULT_DEBOUNCE = 0.3
+
+# Constants of the Language Server Protocol.
+SYNC_INCREMENTAL = 2
+SEVERITY_WARNING = 2
+METHOD_NOT_FOUND = -32601
+
+
+async def read_message(reader):
+    """
+    Reads a JSON-RPC message, framed by a Content-Length header.
+
+    Args:
+        reader (asyncio.StreamReader): Stream to read from.
+
+    Returns:
+        dict: Message, or None at the end of the stream.
+    """
+    length = None
+
+    while True:
+        header = await reader.readline()
+        if not header:
+            return None
+
+        header = header.decode("ascii").strip()
+        if not header:
+            break
+
+        name, _, value = header.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+
+    if length is None:
+        return None
+
+    return json.loads(await reader.readexactly(length))
+
+
+def encode_message(message):
+    """
+    Returns a JSON-RPC message, framed by a Content-Length header.
+
+    Args:
+        message (dict): Message.
+
+    Returns:
+        bytes: Framed message.
+    """
+    body = json.dumps(message).encode()
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+
+def utf16_length(text):
+    """
+    Returns the length of a text in UTF-16 code units, the unit of the
+    character positions of the protocol.
+
+    Args:
+        text (str): Text.
+
+    Returns:
+        int: Number of code units.
+    """
+    if text.isascii():
+        return len(text)
+
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def utf16_index(line, units):
+    """
+    Returns the index of a character of a line, given its position in
+    UTF-16 code units.
+
+    Args:
+        line (str): Line of text.
+        units (int): Position of the character, in code units.
+
+    Returns:
+        int: Index of the character in the line.
+    """
+    if line.isascii():
+        return min(units, len(line))
+
+    for idx, char in enumerate(line):
+        if units <= 0:
+            return idx
+        units -= 2 if ord(char) > 0xFFFF else 1
+
+    return len(line)
+
+
+def _changed_lines(text, change):
+    """
+    Applies a change of a document to its text.
+
+    Args:
+        text (str): Text of the document.
+        change (dict):  TextDocumentContentChangeEvent. Without a range,
+                        it replaces the whole text. Characters are counted
+                        in UTF-16 code units.
+
+    Returns:
+        tuple:  (new_text, first_line, old_last_line, new_last_line)
+                Lines of the text that changed, starting at 0, before and
+                after the change.
+    """
+    lines = text.splitlines(keepends=True)
+    new_text = change["text"]
+
+    if "range" not in change:
+        new_lines = new_text.splitlines(keepends=True)
+        first = 0
+        while (first < min(len(lines), len(new_lines))
+               and lines[first] == new_lines[first]):
+            first += 1
+
+        common = 0
+        while (common < min(len(lines), len(new_lines)) - first
+               and lines[-1 - common] == new_lines[-1 - common]):
+            common += 1
+
+        return (new_text, first, len(lines) - common - 1,
+                len(new_lines) - common - 1)
+
+    def offset(position):
+        line = position["line"]
+        if line >= len(lines):
+            return len(text)
+        return (sum(map(len, lines[:line]))
+                + utf16_index(lines[line], position["character"]))
+
+    start, end = change["range"]["start"], change["range"]["end"]
+    new_text = text[:offset(start)] + new_text + text[offset(end):]
+
+    return (new_text, start["line"], end["line"],
+            start["line"] + change["text"].count("\n"))
+
+
+def _diagnostic(lines, fun_name, exc_name, exc_line):
+    """
+    Returns an LSP Diagnostic for an exception, covering the code of the
+    line it is raised at.
+    """
+    text = lines[exc_line - 1] if 0 < exc_line <= len(lines) else ""
+    indentation = len(text) - len(text.lstrip())
+
+    return {
+        "range": {
+            "start": {"line": exc_line - 1, "character": indentation},
+            "end": {"line": exc_line - 1,
+                    "character": indentation
+                    + utf16_length(text.strip())},
+        },
+        "severity": SEVERITY_WARNING,
+        "source": SERVER_NAME,
+        "code": exc_name,
+        "message": f"'{exc_name}' may be raised by '{fun_name}' and is "
+                   f"neither handled nor documented.",
+    }
+
+
+class Document:
+    """
+    A document open in the editor, and what is kept of its last analysis
+    to analyse it again quickly.
+    """
+
+    def __init__(self, uri, text, version):
+        self.uri = uri
+        self.text = text
+        self.version = version
+
+        # Function summaries, see exceptions.function_exception_table().
+        self.memo = {}
+        # Exceptions raised by each function at the last full analysis.
+        self.table = {}
+        # Reported exceptions, as [(fun_name, exception_name, line), ...],
+        # moved along with the lines around them as the document changes.
+        self.reported = []
+        # Lines changed since the last full analysis, as (first, last),
+        # starting at 0.
+        self.edited = []
+        # Pending analysis, cancelled by newer changes.
+        self.task = None
+
+    def change(self, change, version):
+        """
+        Applies a change of the document.
+
+        Args:
+            change (dict): TextDocumentContentChangeEvent.
+            version (int): Version of the document after the change.
+        """
+        self.text, first, old_last, new_last = _changed_lines(self.text,
+                                                              change)
+        self.version = version
+        delta = new_last - old_last
+
+        # Lines after the change move, the ones in it are reported again.
+        self.reported = [(fun_name, exc_name,
+                          exc_line + delta if exc_line > old_last + 1
+                          else exc_line)
+                         for fun_name, exc_name, exc_line in self.reported
+                         if not first < exc_line <= old_last + 1]
+
+        self.edited = [(start + delta, end + delta) if start > old_last
+                       else (start, end)
+                       for start, end in self.edited]
+        self.edited.append((first, max(first, new_last)))
+
+    def edited_exceptions(self, text, edited):
+        """
+        Analyses the functions that overlap the changed lines, resolving
+        their calls with the results of the last full analysis.
+
+        Args:
+            text (str): Text of the document.
+            edited (list): Lines changed in the text, see Document.edited.
+
+        Returns:
+            list:   Reported exceptions of the document, with the ones of
+                    the changed functions up to date.
+                    [(fun_name, exception_name, line), ...]
+        """
+        symbols = SymbolTable()
+        fun_dict = {}
+        documented_dict = {}
+
+        try:
+            functions = list(scan_functions(io.StringIO(text, newline=None),
+                                            on_class=symbols.add_class))
+            for _, fun_name, _ in functions:
+                symbols.add_function(fun_name)
+
+            known_functions = ChainMap({}, ExceptionNames(self.table))
+
+            for fun_idx, fun_name, fun_body in functions:
+
+                # Lines of the function, starting at 0, from its declaration
+                # to the end of its body. fun_idx is the line before the
+                # body starting at 1, that is, the first body line starting
+                # at 0, or the declaration itself for one-liners.
+                first_line = max(fun_idx - 1, 0)
+                last_line = fun_idx + fun_body.rstrip().count("\n")
+                if not any(first_line <= end and start <= last_line
+                           for start, end in edited):
+                    continue
+
+                fingerprint = function_fingerprint(fun_body)
+                if fingerprint not in self.memo:
+                    self.memo[fingerprint] = (
+                        function_summary(fun_body),
+                        documented_exceptions(get_doctring(fun_body)))
+                summary, documented_dict[fun_name] = self.memo[fingerprint]
+
+                # Recursive calls do not add anything new.
+                known_functions.maps[0] = {fun_name: ()}
+                fun_dict[fun_name] = resolve_summary(
+                    fun_idx, resolve_calls(summary, fun_name, symbols),
+                    known_functions)
+
+        finally:
+            symbols.unregister_exceptions()
+
+        return ([reported
+                 for reported in self.reported
+                 if reported[0] not in fun_dict]
+                + list(reported_exceptions(OccurrenceStore(fun_dict),
+                                           documented_dict)))
+
+    def all_exceptions(self, text):
+        """
+        Analyses the whole document, reusing the summaries of the functions
+        that did not change. The document is left as it is, see
+        Server.analyze().
+
+        Args:
+            text (str): Text of the document.
+
+        Returns:
+            tuple:  (table, reported)
+                    table is the exceptions raised by each function, to
+                    become Document.table.
+                    reported = [(fun_name, exception_name, line), ...]
+        """
+        table, documented = function_exception_table(
+            self.uri, self.memo, file=io.StringIO(text, newline=None))
+
+        return table, list(reported_exceptions(table, documented))
+
+
+class Server:
+    """
+    Language server that publishes the uncaught exceptions of the open
+    documents as diagnostics, over JSON-RPC.
+
+    Documents are analysed once they stop changing for a while. A change
+    cancels the analysis in progress, and the functions that changed are
+    published first, before the rest of the document is analysed again.
+    """
+
+    def __init__(self, out, debounce=DEFAULT_DEBOUNCE):
+        """
+        Args:
+            out (io.BufferedIOBase): Stream the messages are written to.
+            debounce (float): Seconds without changes to a document before
+                              it is analysed.
+        """
+        self.out = out
+        self.debounce = debounce
+        self.documents = {}
+        # Analyses run one at a time out of the event loop, so that messages
+        # are still read, and newer changes cancel them, while they run.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.handlers = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+        }
+
+    def send(self, message):
+        self.out.write(encode_message({"jsonrpc": "2.0", **message}))
+        self.out.flush()
+
+    async def serve(self, reader):
+        """
+        Handles the messages of a client until it exits or the stream ends.
+
+        Args:
+            reader (asyncio.StreamReader): Stream the messages are read from.
+        """
+        while True:
+            message = await read_message(reader)
+            if message is None or message.get("method") == "exit":
+                break
+            self.handle(message)
+
+        for document in self.documents.values():
+            if document.task is not None:
+                document.task.cancel()
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def handle(self, message):
+        """
+        Handles a request or a notification. Notifications without a
+        handler are ignored.
+
+        Args:
+            message (dict): JSON-RPC message.
+        """
+        handler = self.handlers.get(message.get("method"))
+
+        if "id" not in message:
+            if handler is not None:
+                handler(message.get("params", {}))
+            return
+
+        if handler is None:
+            self.send({"id": message["id"],
+                       "error": {"code": METHOD_NOT_FOUND,
+                                 "message": f"Unknown method "
+                                            f"'{message.get('method')}'."}})
+            return
+
+        self.send({"id": message["id"],
+                   "result": handler(message.get("params", {}))})
+
+    def initialize(self, params):
+        return {"capabilities": {"textDocumentSync": SYNC_INCREMENTAL},
+                "serverInfo": {"name": SERVER_NAME}}
+
+    def shutdown(self, params):
+        return None
+
+    def did_open(self, params):
+        item = params["textDocument"]
+        document = Document(item["uri"], item["text"], item.get("version"))
+        self.documents[document.uri] = document
+        self.schedule(document, 0)
+
+    def did_change(self, params):
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+
+        for change in params["contentChanges"]:
+            document.change(change, params["textDocument"].get("version"))
+        self.schedule(document, self.debounce)
+
+    def did_close(self, params):
+        document = self.documents.pop(params["textDocument"]["uri"], None)
+        if document is None:
+            return
+
+        if document.task is not None:
+            document.task.cancel()
+        self.publish(document, [])
+
+    def schedule(self, document, delay):
+        if document.task is not None:
+            document.task.cancel()
+        document.task = asyncio.create_task(self.analyze(document, delay))
+
+    async def analyze(self, document, delay):
+        """
+        Analyses a document after a delay, publishing the functions that
+        changed first. Cancelled if the document changes in the meantime.
+
+        The analyses run in the executor, on the text as it was when they
+        started. Their results are only applied to the document here, in
+        the event loop, so the ones of a cancelled analysis are dropped.
+        """
+        await asyncio.sleep(delay)
+        loop = asyncio.get_running_loop()
+        text = document.text
+
+        try:
+            if document.edited and document.table:
+                reported = await loop.run_in_executor(
+                    self.executor, document.edited_exceptions, text,
+                    list(document.edited))
+                self.publish(document, reported)
+
+            document.table, reported = await loop.run_in_executor(
+                self.executor, document.all_exceptions, text)
+            document.edited = []
+            self.publish(document, reported)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    def publish(self, document, reported):
+        document.reported = reported
+        lines = document.text.splitlines()
+
+        self.send({"method": "textDocument/publishDiagnostics",
+                   "params": {"uri": document.uri,
+                              "version": document.version,
+                              "diagnostics": [_diagnostic(lines, *exception)
+                                              for exception in reported]}})
+
+
+async def serve_stdio(debounce=DEFAULT_DEBOUNCE):
+    """
+    Runs the server on stdin and stdout until the client exits.
+
+    Args:
+        debounce (float): See Server.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    await Server(sys.stdout.buffer, debounce).serve(reader)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Language server that reports uncaught exceptions as "
+                    "diagnostics, over stdin and stdout.")
+    parser.add_argument("--debounce",
+                        type=float,
+                        default=DEFAULT_DEBOUNCE,
+                        help=f"seconds without changes before a document "
+                             f"is analysed (default: {DEFAULT_DEBOUNCE})")
+    args = parser.parse_args()
+
+    asyncio.run(serve_stdio(args.debounce))
+
+
+if __name__ == "__main__":
+    main()
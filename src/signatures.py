@@ -0,0 +1,158 @@
+"""
+@file     signatures.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+from functools import lru_cache
+
+
+SIGNATURES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "signatures.db")
+
+# Overrides SIGNATURES_FILE, in this process and the ones it starts.
+SIGNATURES_ENV = "EXCEPTION_CONTROL_SIGNATURES"
+
+_CONNECTION = None
+_VERSION = None
+
+
+def signatures_file():
+    """
+    Returns the path to the signature database in use.
+
+    Returns:
+        str: Path to the database.
+    """
+    return os.environ.get(SIGNATURES_ENV, SIGNATURES_FILE)
+
+
+def signatures_version():
+    """
+    Returns an identifier of the signature database in use, which changes
+    when the database is rebuilt, so that results computed with another
+    database are not reused.
+
+    Returns:
+        str: Identifier of the database.
+    """
+    global _VERSION
+
+    if _VERSION is None:
+        try:
+            stat = os.stat(signatures_file())
+            _VERSION = f"{stat.st_size}-{stat.st_mtime_ns}"
+        except OSError:
+            _VERSION = "none"
+
+    return _VERSION
+
+
+def _connect(filename):
+    """
+    Opens a signature database read-only.
+
+    Args:
+        filename (str): Path to the database.
+
+    Returns:
+        sqlite3.Connection: Connection.
+
+    Raises:
+        sqlite3.Error: If the database cannot be opened.
+    """
+    import sqlite3
+    from urllib.parse import quote
+
+    # Characters like '?' and '#' would end the path of the URI.
+    return sqlite3.connect(f"file:{quote(filename)}?mode=ro", uri=True,
+                           check_same_thread=False)
+
+
+def _connection():
+    """
+    Returns a read-only connection to the signature database, opening it
+    the first time it is needed. The database is queried on disk, so memory
+    use does not depend on its size.
+
+    Returns:
+        sqlite3.Connection: Connection, or None if there is no database.
+    """
+    global _CONNECTION
+
+    if _CONNECTION is None:
+        import sqlite3
+
+        try:
+            _CONNECTION = _connect(signatures_file())
+        except sqlite3.Error:
+            _CONNECTION = False
+
+    return _CONNECTION or None
+
+
+def use_signatures(filename):
+    """
+    Replaces the signature database, for example with one built by
+    tools/build_signatures.py for the libraries of a project.
+
+    Args:
+        filename (str): Path to the database.
+
+    Raises:
+        OSError: If the file cannot be opened or is not a signature
+                 database. The database in use is kept.
+    """
+    global _CONNECTION, _VERSION
+    import sqlite3
+
+    filename = os.path.abspath(filename)
+    if not os.path.isfile(filename):
+        raise OSError(f"Signature database '{filename}' not found.")
+
+    # Only checked here. Each process opens its own connection when it is
+    # first needed, as connections cannot be shared with forked processes.
+    connection = None
+    try:
+        connection = _connect(filename)
+        connection.execute("SELECT name, exceptions FROM signatures "
+                           "LIMIT 1").fetchall()
+
+    except sqlite3.Error as sqlite_err:
+        raise OSError(f"File '{filename}' is not a signature database: "
+                      f"{sqlite_err}.")
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if _CONNECTION:
+        _CONNECTION.close()
+
+    os.environ[SIGNATURES_ENV] = filename
+    _CONNECTION = None
+    _VERSION = None
+    signature_excs.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def signature_excs(qualified_name):
+    """
+    Returns the exceptions raised by a standard library or third-party
+    callable, according to the signature database.
+
+    Args:
+        qualified_name (str): Name of the callable, like 'json.loads'.
+
+    Returns:
+        tuple: Names of the exceptions, empty if the callable is unknown.
+    """
+    connection = _connection()
+    if connection is None:
+        return ()
+
+    row = connection.execute("SELECT exceptions FROM signatures "
+                             "WHERE name = ?", (qualified_name,)).fetchone()
+
+    return tuple(row[0].split(",")) if row else ()
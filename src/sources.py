@@ -0,0 +1,107 @@
+"""
+@file     sources.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import io
+from runner import engine_table
+from string_utils import shortened
+
+
+def _source_file(source):
+    """
+    Returns a text file that reads from source code held in memory.
+
+    Args:
+        source (str or bytes):  Source code. Bytes are decoded with the
+                                encoding declared in the code, or UTF-8.
+
+    Returns:
+        io.TextIOBase: Open text file.
+
+    Raises:
+        SyntaxError: If the declared encoding is unknown.
+    """
+    if isinstance(source, str):
+        return io.StringIO(source, newline=None)
+
+    # Only needed for bytes.
+    from tokenize import detect_encoding
+
+    encoding, _ = detect_encoding(io.BytesIO(source).readline)
+    return io.TextIOWrapper(io.BytesIO(source), encoding=encoding)
+
+
+def _source_previews(source_file, fun_table):
+    """
+    Returns the previews of the lines of source code shown in the report
+    of its table, see string_utils.file_previews().
+    """
+    shown = {line_idx
+             for fun_name in fun_table
+             for _, line_idx in fun_table[fun_name]}
+
+    return {line_number: shortened(line.strip())
+            for line_number, line in enumerate(source_file, start=1)
+            if line_number in shown}
+
+
+def analyze_source(source, name="<source>", engine="lines", previews=None):
+    """
+    Analyses source code held in memory, like runner.analyze_file() does
+    with a file, catching the errors that prevent its analysis.
+
+    Args:
+        source (str or bytes):  Source code. Bytes are decoded with the
+                                encoding declared in the code, or UTF-8.
+        name (str): Name of the source in the results, like its path.
+        engine (str): Name of the engine to use, a key of runner.ENGINES.
+        previews (dict):    If given, the lines to show in the report of
+                            the source are stored here, see
+                            string_utils.file_previews().
+
+    Returns:
+        tuple:  (name, fun_dict, documented_dict, error), like
+                runner.analyze_file().
+    """
+    try:
+        table, documented = engine_table(engine)(name,
+                                                 file=_source_file(source))
+
+        # The engines close the file they read once they are done.
+        if previews is not None:
+            previews.update(_source_previews(_source_file(source), table))
+
+    except (UnicodeDecodeError, OSError):
+        return name, {}, {}, f"Source '{name}' is not valid text."
+
+    except SyntaxError as syntax_err:
+        return (name, {}, {},
+                f"Source '{name}' could not be parsed: {syntax_err}")
+
+    return name, table, documented, None
+
+
+def analyze_sources(sources, engine="lines", previews=None):
+    """
+    Analyses several sources held in memory, one after the other, in the
+    current process.
+
+    Args:
+        sources (iterable): (name, source) pairs, see analyze_source().
+        engine (str): Name of the engine to use, a key of runner.ENGINES.
+        previews (dict):    If given, filled with the lines to show in the
+                            report of each source, by name, before its
+                            result is yielded, like runner.stream_files().
+
+    Yields:
+        tuple:  (name, fun_dict, documented_dict, error) for each source,
+                in the same order as sources.
+    """
+    for name, source in sources:
+        source_previews = None
+        if previews is not None:
+            source_previews = previews[name] = {}
+
+        yield analyze_source(source, name, engine, source_previews)
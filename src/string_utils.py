@@ -4,34 +4,79 @@
 @author   Julio Cabria
 """
 
+import os
 import re
-from colorama import Fore, Back, Style
+import sys
+from functools import lru_cache
+
+
+# Whether reports are colored, and the escape codes of each color. colorama
+# is only imported once a colored report is written, so that runs without
+# colors, like the ones writing to a pipe, do not pay for it.
+_color = {"enabled": None, "codes": None}
+
+
+def use_color(enabled=None):
+    """
+    Sets whether the reports are colored.
+
+    Args:
+        enabled (bool): If None, they are colored when stdout is a terminal
+                        and the NO_COLOR environment variable is not set.
+    """
+    if enabled is None:
+        enabled = sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+
+    _color["enabled"] = enabled
+
+
+def _colored(color, text):
+    if _color["enabled"] is None:
+        use_color()
+
+    if not _color["enabled"]:
+        return str(text)
+
+    if _color["codes"] is None:
+        from colorama import Fore, Back, Style
+
+        _color["codes"] = {"green": Fore.GREEN,
+                           "red": Fore.RED,
+                           "yellow": Fore.YELLOW,
+                           "cyan": Fore.CYAN,
+                           "grey_bkg": Back.LIGHTBLACK_EX,
+                           "reset": Style.RESET_ALL}
+
+    codes = _color["codes"]
+    return f"{codes[color]}{text}{codes['reset']}"
 
 
 def green(text):
-    return f"{Fore.GREEN}{text}{Style.RESET_ALL}"
+    return _colored("green", text)
 
 
 def red(text):
-    return f"{Fore.RED}{text}{Style.RESET_ALL}"
+    return _colored("red", text)
 
 
 def yellow(text):
-    return f"{Fore.YELLOW}{text}{Style.RESET_ALL}"
+    return _colored("yellow", text)
 
 
 def cyan(text):
-    return f"{Fore.CYAN}{text}{Style.RESET_ALL}"
+    return _colored("cyan", text)
 
 
 def grey_bkg(text):
-    return f"{Back.LIGHTBLACK_EX}{text}{Style.RESET_ALL}"
+    return _colored("grey_bkg", text)
 
 
-def remove_string_literals(text):
+STRING_LITERAL_PATTERN = re.compile(r'(\'[^\']*\'|\"[^\"]*\")')
+
 
-    pattern = r'(\'[^\']*\'|\"[^\"]*\")'
-    text = re.sub(pattern, '', text)
+def _remove_string_literals(text):
+
+    text = STRING_LITERAL_PATTERN.sub('', text)
 
     triple_quote_index = text.find('"""')
     if triple_quote_index == -1:
@@ -40,19 +85,57 @@ def remove_string_literals(text):
     return text[:triple_quote_index]
 
 
-def to_dict_inverted(list_of_tuples):
+# Lines with quotes kept cleaned by remove_string_literals(), the least
+# recently used are dropped first. Each line is cleaned by several stages,
+# and many lines, like 'return ""', repeat along a file.
+LINE_CACHE_SIZE = 4096
 
-    dictionary = {}
+# Overrides LINE_CACHE_SIZE, in this process and the ones it starts.
+LINE_CACHE_ENV = "EXCEPTION_CONTROL_LINE_CACHE"
 
-    for key, value in list_of_tuples:
+_CLEANED_LINES = None
 
-        if value in dictionary:
-            dictionary[value] += ", " + key
-            continue
 
-        dictionary[value] = key
+def use_line_cache(maxsize):
+    """
+    Sets how many cleaned lines are kept, emptying the cache.
+
+    Args:
+        maxsize (int): Number of lines, 0 to clean every line again.
+    """
+    global _CLEANED_LINES
+
+    os.environ[LINE_CACHE_ENV] = str(maxsize)
+    _CLEANED_LINES = None
 
-    return dictionary
+
+def line_cache_info():
+    """
+    Returns the statistics of the cache of cleaned lines of this process.
+
+    Returns:
+        functools._CacheInfo: (hits, misses, maxsize, currsize)
+    """
+    return _cleaned_lines().cache_info()
+
+
+def _cleaned_lines():
+    global _CLEANED_LINES
+
+    if _CLEANED_LINES is None:
+        maxsize = int(os.environ.get(LINE_CACHE_ENV, LINE_CACHE_SIZE))
+        _CLEANED_LINES = lru_cache(maxsize=maxsize)(_remove_string_literals)
+
+    return _CLEANED_LINES
+
+
+def remove_string_literals(text):
+
+    # Most lines have no quotes, there is nothing to clean or look up.
+    if "'" not in text and '"' not in text:
+        return text
+
+    return (_CLEANED_LINES or _cleaned_lines())(text)
 
 
 def get_doctring(text):
@@ -63,140 +146,171 @@ def get_doctring(text):
         return None
 
 
-def table_str(filename, fun_table, documented_table):
+REPORT_HINT = """
+To remove an exception from the report, enclose
+the code inside a try/except block or add the
+exception name to the function's docstring.
+"""
 
-    try:
-        with open(filename, 'r') as file:
-            lines = file.readlines()
 
-    except OSError:
-        return f"\nError: File '{filename}' not found.\n"
+def file_previews(filename):
+    """
+    Returns the previews of the lines of a file.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        dict: previews[line_number] = line_text
 
-    printed = False
-    text = ""
-    for fun_name, fun_excs in fun_table.items():
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(filename, 'r') as file:
+        return {line_number: shortened(line.strip())
+                for line_number, line in enumerate(file, start=1)}
 
-        fun_excs = {exc_line: exc_name
-                    for exc_line, exc_name
-                    in to_dict_inverted(fun_excs).items()
-                    if exc_name not in documented_table[fun_name]}
 
-        if not fun_excs:
-            continue
+def functions_str(previews, fun_table, documented_table):
+    """
+    Returns the report of the undocumented exceptions of the functions of
+    a file.
 
-        text += f"\n{green(fun_name)}\n"
+    Args:
+        previews (dict): previews[line_number] = line_text, the lines of the
+                         file that may be shown in the report.
+        fun_table (OccurrenceStore): Exceptions raised by each function.
+        documented_table (dict): documented_table[fun_name] = {exc, ...}
 
-        for exc_line, exc_name in fun_excs.items():
-            text += " "*2 + f"{yellow(exc_name)}\n"
+    Returns:
+        str: Report, empty if there are no uncaught exceptions.
+    """
+    parts = []
+    for fun_name in fun_table:
 
-            try:
-                file_line = shortened(lines[exc_line-1].strip())
+        fun_excs = fun_table.grouped(fun_name, documented_table[fun_name])
+        header = f"\n{green(fun_name)}\n"
 
-            except IndexError:
-                file_line = "Could not load line preview."
+        for exc_line, exc_names in fun_excs:
+            parts.append(header)
+            header = ""
 
-            printed = True
-            line_number = " "*2 + grey_bkg(str(exc_line).rjust(4))
-            text += f"{line_number}  {file_line}\n"
+            parts.append(" "*2 + f"{yellow(', '.join(exc_names))}\n")
 
-    text += \
-        cyan("""
-To remove an exception from the report, enclose
-the code inside a try/except block or add the
-exception name to the function's docstring.
-""")
+            file_line = previews.get(exc_line, "Could not load line preview.")
 
-    if not printed:
-        text = "\n---- No uncaught exceptions ----\n"
+            line_number = " "*2 + grey_bkg(str(exc_line).rjust(4))
+            parts.append(f"{line_number}  {shortened(file_line)}\n")
 
-    return text
+    return "".join(parts)
 
 
-def grab(text: str, *, start, end):
+def table_str(filename, fun_table, documented_table, previews=None):
     """
-    Returns text between two start and end delimiters.
+    Returns the report of a single file.
 
     Args:
-        text (str): Text to search.
-        start (str): Start delimiter.
-        end (str): End delimiter.
+        filename (str): Path to the file.
+        fun_table (OccurrenceStore): Exceptions raised by each function.
+        documented_table (dict): documented_table[fun_name] = {exc, ...}
+        previews (dict):    Lines to show, see functions_str(). If None, they
+                            are read from the file.
 
     Returns:
-        str: Text between start and end delimiters.
-
-    Raises:
-        IndexError: If start or end delimiter is not found.
+        str: Report.
     """
-    start_index = text.find(start)
-    if start_index == -1:
-        raise IndexError(f"'{start}' string not present in '{text}'.")
+    if previews is None:
+        try:
+            previews = file_previews(filename)
 
-    end_index = text.find(end, start_index + len(start))
-    if end_index == -1:
-        raise IndexError(f"'{end}' string not present in '{text}'.")
+        except OSError:
+            return f"\nError: File '{filename}' not found.\n"
 
-    return text[start_index + len(start):end_index]
+    text = functions_str(previews, fun_table, documented_table)
+
+    if not text:
+        return "\n---- No uncaught exceptions ----\n"
+
+    return text + cyan(REPORT_HINT)
 
 
-def line_indentation(line):
+def file_report_str(filename, fun_table, documented_table, error,
+                    previews=None):
     """
-    Returns the number of spaces at the beginning of a line.
+    Returns the part of a report of several files that belongs to a file.
 
     Args:
-        line (str): Line of text.
+        filename (str): Path to the file.
+        fun_table (OccurrenceStore): Exceptions raised by each function.
+        documented_table (dict): documented_table[fun_name] = {exc, ...}
+        error (str): Reason why the file could not be analysed, or None.
+        previews (dict):    Lines to show, see functions_str(). If None, they
+                            are read from the file.
 
     Returns:
-        int: Number of spaces at the beginning of the line.
+        str: Report of the file, empty if there are no uncaught exceptions.
     """
-    return len(line) - len(line.lstrip())
+    if error:
+        return f"\n{red('Error:')} {error}\n"
 
+    if previews is None:
+        try:
+            previews = file_previews(filename)
 
-def index_in_list(string, lst):
+        except OSError:
+            return f"\n{red('Error:')} File '{filename}' not found.\n"
+
+    file_text = functions_str(previews, fun_table, documented_table)
+    if not file_text:
+        return ""
+
+    return f"\n{cyan(filename)}\n{file_text}"
+
+
+def report_str(results):
     """
-    Returns the index of a string in a list.
+    Returns a single report for the results of several files.
 
     Args:
-        string (str): String to search for.
-        lst (list): List of strings.
+        results (iterable): (filename, fun_table, documented_table, error)
+                            for each file, as yielded by
+                            runner.analyze_files().
 
     Returns:
-        int: Index of the string in the list.
-
-    Raises:
-        IndexError: If string is not found in list.
+        str: Report, with line numbers relative to each file.
     """
-    try:
-        return next(idx
-                    for idx, line
-                    in enumerate(lst)
-                    if string.strip() in line.strip())
+    text = "".join(file_report_str(*result) for result in results)
 
-    except StopIteration:
-        raise IndexError(f"'{string}' not found in list.")
+    if not text:
+        return "\n---- No uncaught exceptions ----\n"
 
+    return text + cyan(REPORT_HINT)
 
-def first_nonempty_line(text_lines, start=0):
+
+def grab(text: str, *, start, end):
     """
-    Returns the text of the first nonempty line in a list of lines.
+    Returns text between two start and end delimiters.
 
     Args:
-        text_lines (list): List of lines.
+        text (str): Text to search.
+        start (str): Start delimiter.
+        end (str): End delimiter.
 
     Returns:
-        int: Index of the first nonempty line.
+        str: Text between start and end delimiters.
 
     Raises:
-        IndexError: If no nonempty lines are found.
+        IndexError: If start or end delimiter is not found.
     """
-    try:
-        return next(line
-                    for line
-                    in text_lines[start:]
-                    if line.strip()
-                    and not line.lstrip().startswith("#"))
-
-    except StopIteration:
-        raise IndexError("No nonempty lines found.")
+    start_index = text.find(start)
+    if start_index == -1:
+        raise IndexError(f"'{start}' string not present in '{text}'.")
+
+    end_index = text.find(end, start_index + len(start))
+    if end_index == -1:
+        raise IndexError(f"'{end}' string not present in '{text}'.")
+
+    return text[start_index + len(start):end_index]
 
 
 def shortened(text, length=60):
@@ -0,0 +1,137 @@
+"""
+@file     symbols.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+from database import EXCEPTION_GROUPS
+from database import expand_groups
+from database import register_exception
+from database import unregister_exception
+from functions import SELF_NAMES
+
+
+class SymbolTable:
+    """
+    Functions and classes defined in a file, by qualified name, like
+    'Class.method'. Calls are resolved to the function they call with a
+    few dictionary lookups, whatever the size of the file.
+
+    Classes that derive from an exception are added to the exception
+    hierarchy while the file is analysed, see unregister_exceptions().
+    """
+
+    def __init__(self):
+        # functions[qualified_name] = index of its last definition
+        self.functions = {}
+        # classes[qualified_name] = [base_name, ...]
+        self.classes = {}
+        self.exceptions = []
+
+    def add_function(self, fun_name, value=None):
+        """
+        Adds a function, or a method by its qualified name.
+
+        Args:
+            fun_name (str): Qualified name of the function.
+            value: Kept in functions[fun_name], like the index of the
+                   function.
+        """
+        self.functions[fun_name] = value
+
+    def add_class(self, class_name, bases):
+        """
+        Adds a class. If it derives from a known exception, it is added to
+        the exception hierarchy, under its first base that is one.
+
+        Args:
+            class_name (str): Qualified name of the class.
+            bases (list): Names of its base classes, as written.
+        """
+        self.classes[class_name] = bases
+
+        exc = class_name.rsplit(".", maxsplit=1)[-1]
+        if exc in EXCEPTION_GROUPS:
+            return
+
+        for base in bases:
+            exc_group = base.rsplit(".", maxsplit=1)[-1]
+            if exc_group not in expand_groups({"BaseException"}):
+                continue
+
+            try:
+                register_exception(exc, exc_group)
+                self.exceptions.append(exc)
+            except ValueError:
+                pass
+            return
+
+    def unregister_exceptions(self):
+        """
+        Removes the exceptions added by add_class() from the exception
+        hierarchy, so that they do not leak into the analysis of other
+        files.
+        """
+        for exc in reversed(self.exceptions):
+            unregister_exception(exc)
+        self.exceptions = []
+
+    def method(self, class_name, method_name):
+        """
+        Returns the qualified name of a method of a class, defined in the
+        class or inherited from one of its bases in the file.
+
+        Args:
+            class_name (str): Qualified name of the class.
+            method_name (str): Name of the method.
+
+        Returns:
+            str: Qualified name of the method, or None if it is not found.
+        """
+        pending = [class_name]
+        seen = set()
+
+        while pending:
+            class_name = pending.pop(0)
+            if class_name in seen or class_name not in self.classes:
+                continue
+            seen.add(class_name)
+
+            if f"{class_name}.{method_name}" in self.functions:
+                return f"{class_name}.{method_name}"
+
+            pending.extend(self.classes[class_name])
+
+        return None
+
+    def resolve(self, fun_name, caller=None):
+        """
+        Returns the qualified name of the function a call refers to.
+
+        Args:
+            fun_name (str): Name of the function, as written in the call, or
+                            with its receiver replaced by its class, see
+                            functions.typed_call().
+            caller (str): Qualified name of the calling function, to resolve
+                          calls on self and cls.
+
+        Returns:
+            str: Qualified name, or None if the function is not in the file.
+        """
+        receiver, _, name = fun_name.rpartition(".")
+
+        if receiver in SELF_NAMES:
+            class_name = caller.rpartition(".")[0] if caller else ""
+            return self.method(class_name, name)
+
+        if fun_name in self.functions:
+            return fun_name
+
+        # Creating an instance runs __init__.
+        if fun_name in self.classes:
+            return self.method(fun_name, "__init__")
+
+        if receiver in self.classes:
+            return self.method(receiver, name)
+
+        return None
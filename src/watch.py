@@ -0,0 +1,72 @@
+"""
+@file     watch.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import time
+from hashlib import blake2b
+from runner import python_files
+from runner import analyze_file
+
+
+def _fingerprint(filename):
+    with open(filename, "rb") as file:
+        return blake2b(file.read(), digest_size=16).hexdigest()
+
+
+def watch(paths, engine="lines", interval=1.0):
+    """
+    Watches files and directories for changes, keeping the analysis of
+    every file in memory. Only the files whose modification time and
+    contents changed are analysed again, and only the functions that
+    changed inside them.
+
+    Args:
+        paths (list): Paths to files or directories.
+        engine (str): Name of the engine to use, a key of runner.ENGINES.
+        interval (float): Seconds between checks for changes.
+
+    Yields:
+        list:   Results of the files that changed since the last check,
+                starting with every file. Removed files are reported with
+                an error. See runner.analyze_file().
+    """
+    # state[filename] = (mtime, fingerprint, memo)
+    state = {}
+
+    while True:
+        changed = []
+        filenames = python_files(paths)
+
+        for filename in filenames:
+
+            try:
+                mtime = os.stat(filename).st_mtime_ns
+                if filename in state and state[filename][0] == mtime:
+                    continue
+
+                fingerprint = _fingerprint(filename)
+
+            except OSError:
+                mtime, fingerprint = None, None
+
+            _, last_fingerprint, memo = state.get(filename, (None, "", {}))
+            state[filename] = mtime, fingerprint, memo
+
+            # Unreadable files are reported once, until they change.
+            if fingerprint == last_fingerprint:
+                continue
+
+            changed.append(analyze_file(filename, engine, memo=memo))
+
+        for filename in set(state).difference(filenames):
+            del state[filename]
+            changed.append((filename, {}, {},
+                            f"File '{filename}' was removed."))
+
+        if changed:
+            yield changed
+
+        time.sleep(interval)
@@ -0,0 +1,11 @@
+"""
+@file     conftest.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import sys
+
+# The modules of src/ import each other by name, like when main.py runs.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,61 @@
+"""
+@file     test_code_parsing.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+from code_parsing import scan_functions
+
+
+def _functions(source):
+    classes = {}
+    functions = [fun_name
+                 for _, fun_name, _ in scan_functions(source.splitlines(True),
+                                                      classes.__setitem__)]
+    return functions, classes
+
+
+def test_docstring_mentioning_a_class():
+    functions, classes = _functions('class A:\n'
+                                    '    """\n'
+                                    '    class instances are cheap\n'
+                                    '    """\n'
+                                    '\n'
+                                    '    def f(self):\n'
+                                    '        raise ValueError\n'
+                                    '\n'
+                                    '\n'
+                                    'def g():\n'
+                                    '    """\n'
+                                    '    class X of the thing\n'
+                                    '    """\n'
+                                    '    raise KeyError\n')
+
+    assert functions == ["A.f", "g"]
+    assert classes == {"A": []}
+
+
+def test_multiline_class_declaration():
+    functions, classes = _functions("class A(\n"
+                                    "    Base,  # (\n"
+                                    "    metaclass=Meta,\n"
+                                    "):\n"
+                                    "    def f(self):\n"
+                                    "        pass\n")
+
+    assert functions == ["A.f"]
+    assert classes == {"A": ["Base"]}
+
+
+def test_unindented_lines_inside_a_string():
+    functions, _ = _functions("class A:\n"
+                              "    def f(self):\n"
+                              '        return """\n'
+                              "class B:\n"
+                              "def h():\n"
+                              '"""\n'
+                              "\n"
+                              "    def g(self):\n"
+                              "        pass\n")
+
+    assert functions == ["A.f", "A.g"]
@@ -0,0 +1,28 @@
+"""
+@file     test_profiling.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(TESTS_DIR, "..", "src", "main.py")
+
+
+@pytest.mark.parametrize("engine", ["lines", "ast"])
+def test_profile(engine):
+    process = subprocess.run([sys.executable, MAIN, "--no-cache", "--profile",
+                              "--engine", engine,
+                              os.path.join(TESTS_DIR, "test.py")],
+                             capture_output=True, text=True)
+
+    assert process.returncode == 0, process.stderr
+
+    # Time is added to the functions of the file, not only to stages.
+    functions = process.stderr.split("Slowest 10 functions:")[1]
+    assert "test.py: main" in functions
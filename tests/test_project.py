@@ -0,0 +1,34 @@
+"""
+@file     test_project.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+from project import analyze_project
+
+
+def _exceptions(results):
+    return {(filename.rsplit("/", maxsplit=2)[-2], fun_name, exc)
+            for filename, fun_dict, _, error in results
+            for fun_name in fun_dict
+            for exc, _ in fun_dict[fun_name]}
+
+
+def test_two_roots_with_the_same_module(tmp_path):
+    for root, source in (("a", "def f():\n    raise ValueError\n"),
+                         ("b", "def g():\n    raise KeyError\n")):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / "util.py").write_text(source)
+        (tmp_path / root / "__init__.py").write_text("")
+
+    (tmp_path / "a" / "main.py").write_text("from util import f\n"
+                                            "\n"
+                                            "def main():\n"
+                                            "    f()\n")
+
+    results = analyze_project([str(tmp_path / "a"), str(tmp_path / "b")])
+
+    assert all(error is None for _, _, _, error in results)
+    assert _exceptions(results) == {("a", "f", "ValueError"),
+                                    ("a", "main", "ValueError"),
+                                    ("b", "g", "KeyError")}
@@ -0,0 +1,82 @@
+"""
+@file     test_server.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import asyncio
+import io
+from server import Document
+from server import Server
+from server import read_message
+
+
+SOURCE = ("def f():\n"
+          "    x = 1\n"
+          "    return x\n"
+          "\n"
+          "def g(): return 1\n")
+
+
+def _edited(document, line, text):
+    """
+    Replaces a line of a document, analysed in full before, and returns
+    the exceptions of the functions it overlaps.
+    """
+    document.table, document.reported = document.all_exceptions(
+        document.text)
+    document.edited = []
+
+    old = document.text.splitlines()[line]
+    document.change({"range": {"start": {"line": line, "character": 0},
+                               "end": {"line": line,
+                                       "character": len(old)}},
+                     "text": text}, 2)
+
+    return document.edited_exceptions(document.text, document.edited)
+
+
+def test_edit_on_the_last_line_of_a_body():
+    document = Document("file:///a.py", SOURCE, 1)
+
+    assert _edited(document, 2, "    raise KeyError") == [("f", "KeyError", 3)]
+    assert (document.all_exceptions(document.text)[1]
+            == [("f", "KeyError", 3)])
+
+
+def test_edit_on_a_one_line_body():
+    document = Document("file:///a.py", SOURCE, 1)
+
+    assert (_edited(document, 4, "def g(): raise KeyError")
+            == [("g", "KeyError", 5)])
+
+
+def test_utf16_positions():
+    document = Document("file:///a.py", "s = '\U0001F600'\nt = 1\n", 1)
+
+    # The emoji takes two code units, the closing quote is at unit 7.
+    document.change({"range": {"start": {"line": 0, "character": 7},
+                               "end": {"line": 0, "character": 7}},
+                     "text": "!"}, 2)
+
+    assert document.text == "s = '\U0001F600!'\nt = 1\n"
+
+
+def test_diagnostic_range_in_utf16():
+    out = io.BytesIO()
+    server = Server(out)
+    document = Document("file:///a.py", "", 1)
+    document.text = "def f():\n    raise KeyError('\U0001F600')\n"
+
+    server.publish(document, [("f", "KeyError", 2)])
+
+    async def published():
+        reader = asyncio.StreamReader()
+        reader.feed_data(out.getvalue())
+        reader.feed_eof()
+        return await read_message(reader)
+
+    message = asyncio.run(published())
+    (diagnostic,) = message["params"]["diagnostics"]
+    assert diagnostic["range"]["start"]["character"] == 4
+    assert diagnostic["range"]["end"]["character"] == 4 + 20
@@ -0,0 +1,53 @@
+"""
+@file     test_signatures.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import sqlite3
+import pytest
+import signatures
+from signatures import SIGNATURES_ENV
+from signatures import signature_excs
+from signatures import use_signatures
+
+
+@pytest.fixture
+def restore_signatures(monkeypatch):
+    monkeypatch.delenv(SIGNATURES_ENV, raising=False)
+    yield
+    monkeypatch.delenv(SIGNATURES_ENV, raising=False)
+    signatures._CONNECTION = None
+    signatures._VERSION = None
+    signature_excs.cache_clear()
+
+
+def test_database_in_a_path_with_uri_characters(tmp_path,
+                                                restore_signatures):
+    directory = tmp_path / "odd?name#dir"
+    directory.mkdir()
+    filename = str(directory / "signatures.db")
+
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE signatures "
+                       "(name TEXT PRIMARY KEY, exceptions TEXT)")
+    connection.execute("INSERT INTO signatures VALUES "
+                       "('mod.function', 'KeyError')")
+    connection.commit()
+    connection.close()
+
+    use_signatures(filename)
+
+    # Only checked, each process opens its own connection when needed.
+    assert signatures._CONNECTION is None
+    assert signature_excs("mod.function") == ("KeyError",)
+
+
+@pytest.mark.parametrize("contents", [None, b"not a database"])
+def test_invalid_database(tmp_path, restore_signatures, contents):
+    filename = tmp_path / "signatures.db"
+    if contents is not None:
+        filename.write_bytes(contents)
+
+    with pytest.raises(OSError):
+        use_signatures(str(filename))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+"""
+@file     build_signatures.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import argparse
+import ast
+import builtins
+import importlib
+import inspect
+import os
+import re
+import sqlite3
+
+
+EXCEPTION_PATTERN = re.compile(
+    r"\b([A-Z]\w*(?:Error|Exception|Exit|Interrupt|Iteration))\b")
+
+DEFAULT_SEED = os.path.join(os.path.dirname(__file__), "signatures.tsv")
+DEFAULT_OUTPUT = os.path.normpath(os.path.join(os.path.dirname(__file__),
+                                              "..", "src", "signatures.db"))
+
+
+def builtin_ancestor(exc_class):
+    """
+    Returns the name of the closest built-in ancestor of an exception class,
+    so that the exception hierarchy in database.py understands it.
+
+    Args:
+        exc_class (type): Exception class.
+
+    Returns:
+        str: Name of the built-in exception.
+    """
+    return next(cls.__name__
+                for cls in exc_class.__mro__
+                if getattr(builtins, cls.__name__, None) is cls)
+
+
+def docstring_excs(docstring, namespace):
+    """
+    Returns the exceptions mentioned in a docstring.
+
+    Args:
+        docstring (str): Docstring of a callable.
+        namespace (dict): Names the exceptions are resolved in, besides the
+                          built-in ones.
+
+    Returns:
+        set: Names of the built-in ancestors of the exceptions mentioned.
+    """
+    excs = set()
+
+    for name in EXCEPTION_PATTERN.findall(docstring or ""):
+        exc_class = namespace.get(name, getattr(builtins, name, None))
+
+        if (isinstance(exc_class, type)
+                and issubclass(exc_class, BaseException)
+                and not issubclass(exc_class, Warning)):
+            excs.add(builtin_ancestor(exc_class))
+
+    return excs
+
+
+def seed_signatures(filename):
+    """
+    Reads signatures from a tab separated file, one per line, like
+    'json.loads<TAB>ValueError'. Lines starting with '#' are comments.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        dict: signatures[qualified_name] = {exception_name, ...}
+    """
+    signatures = {}
+
+    with open(filename, "r") as file:
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+
+            name, excs = line.rstrip("\n").split("\t")
+            signatures.setdefault(name, set()).update(excs.split(","))
+
+    return signatures
+
+
+def module_signatures(module_name):
+    """
+    Reads signatures from the docstrings of the public functions of an
+    importable module.
+
+    Args:
+        module_name (str): Name of the module.
+
+    Returns:
+        dict: signatures[qualified_name] = {exception_name, ...}
+    """
+    module = importlib.import_module(module_name)
+    namespace = vars(module)
+    signatures = {}
+
+    for name, obj in namespace.items():
+        if name.startswith("_") or isinstance(obj, type) or not callable(obj):
+            continue
+
+        excs = docstring_excs(inspect.getdoc(obj), namespace)
+        if excs:
+            signatures[f"{module_name}.{name}"] = excs
+
+    return signatures
+
+
+def stub_signatures(directory):
+    """
+    Reads signatures from the docstrings of the functions in a directory of
+    typeshed-style stubs (.pyi files, or .py files), without importing them.
+    Only exceptions with built-in names are recognized.
+
+    Args:
+        directory (str): Root directory of the stubs.
+
+    Returns:
+        dict: signatures[qualified_name] = {exception_name, ...}
+    """
+    signatures = {}
+
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if not filename.endswith((".pyi", ".py")):
+                continue
+
+            path = os.path.join(root, filename)
+            module_name = os.path.splitext(os.path.relpath(path, directory))[0]
+            module_name = module_name.replace(os.sep, ".")
+            module_name = module_name.removesuffix(".__init__")
+
+            with open(path, "r") as file:
+                tree = ast.parse(file.read(), filename=path)
+
+            for node in tree.body:
+                if not isinstance(node, (ast.FunctionDef,
+                                         ast.AsyncFunctionDef)):
+                    continue
+
+                excs = docstring_excs(ast.get_docstring(node), {})
+                if excs:
+                    signatures[f"{module_name}.{node.name}"] = excs
+
+    return signatures
+
+
+def write_database(signatures, filename):
+    """
+    Writes signatures to a new sqlite database, as a table sorted by
+    qualified name, so that lookups do not need to load it in memory.
+
+    Args:
+        signatures (dict): signatures[qualified_name] = {exception_name, ...}
+        filename (str): Path to the database. Replaced if it exists.
+    """
+    if os.path.exists(filename):
+        os.remove(filename)
+
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE signatures ("
+                       "name TEXT PRIMARY KEY, "
+                       "exceptions TEXT NOT NULL) WITHOUT ROWID")
+    connection.executemany("INSERT INTO signatures VALUES (?, ?)",
+                           ((name, ",".join(sorted(excs)))
+                            for name, excs in sorted(signatures.items())))
+    connection.commit()
+    connection.execute("VACUUM")
+    connection.close()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Builds the signature database of exception-control.")
+
+    parser.add_argument("--seed",
+                        default=DEFAULT_SEED,
+                        help="tab separated file of signatures "
+                             "(default: tools/signatures.tsv)")
+    parser.add_argument("--module",
+                        action="append",
+                        default=[],
+                        help="importable module to read docstrings from")
+    parser.add_argument("--stubs",
+                        action="append",
+                        default=[],
+                        help="directory of stubs to read docstrings from")
+    parser.add_argument("-o", "--output",
+                        default=DEFAULT_OUTPUT,
+                        help="database to write (default: src/signatures.db)")
+
+    args = parser.parse_args()
+
+    # Later sources are merged into earlier ones.
+    signatures = seed_signatures(args.seed) if args.seed else {}
+    sources = ([module_signatures(name) for name in args.module]
+               + [stub_signatures(directory) for directory in args.stubs])
+
+    for source in sources:
+        for name, excs in source.items():
+            signatures.setdefault(name, set()).update(excs)
+
+    write_database(signatures, args.output)
+    print(f"{len(signatures)} signatures written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""
+@file     fake_client.py
+@date     18/10/2026
+@author   Julio Cabria
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+
+SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..",
+                                        "src"))
+TEST_FILE = os.path.normpath(os.path.join(SRC_DIR, "..", "tests", "test.py"))
+
+# Typed one character at a time, at the end of the given line.
+TYPED_LINE = 8
+TYPED_TEXT = "\n    raise KeyError"
+
+
+class FakeClient:
+    """
+    Editor that talks to the server over its stdin and stdout, following a
+    script, and keeps the diagnostics it publishes.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.next_id = 0
+        self.responses = {}
+        self.published = asyncio.Queue()
+        self.reader = asyncio.create_task(self.read())
+
+    async def read(self):
+        # Imported here, so the client runs from any directory.
+        sys.path.insert(0, SRC_DIR)
+        from server import read_message
+
+        while True:
+            message = await read_message(self.process.stdout)
+            if message is None:
+                break
+
+            if message.get("method") == "textDocument/publishDiagnostics":
+                await self.published.put(message["params"])
+            elif "id" in message:
+                self.responses[message["id"]].set_result(message)
+
+    def notify(self, method, params=None):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+
+        body = json.dumps(message).encode()
+        self.process.stdin.write(b"Content-Length: %d\r\n\r\n" % len(body)
+                                 + body)
+
+    async def request(self, method, params=None):
+        self.next_id += 1
+        self.responses[self.next_id] = asyncio.get_running_loop() \
+                                              .create_future()
+
+        message = {"jsonrpc": "2.0", "id": self.next_id, "method": method,
+                   "params": params}
+        body = json.dumps(message).encode()
+        self.process.stdin.write(b"Content-Length: %d\r\n\r\n" % len(body)
+                                 + body)
+
+        return await self.responses[self.next_id]
+
+    async def publications(self, quiet):
+        """
+        Returns the diagnostics published until the server is quiet for the
+        given number of seconds.
+        """
+        published = []
+        while True:
+            try:
+                published.append(await asyncio.wait_for(self.published.get(),
+                                                         quiet))
+            except asyncio.TimeoutError:
+                return published
+
+
+def _summary(params):
+    return (f"version {params['version']}: "
+            + ", ".join(f"{diagnostic['code']}@"
+                        f"{diagnostic['range']['start']['line'] + 1}"
+                        for diagnostic in params["diagnostics"]))
+
+
+async def run_script(filename, debounce, interval):
+    """
+    Opens a file in the server, types a line in it quickly and checks the
+    diagnostics the server publishes.
+
+    Returns:
+        bool: Whether the server behaved as expected.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(SRC_DIR, "server.py"),
+        "--debounce", str(debounce),
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+    client = FakeClient(process)
+    uri = "file://" + os.path.abspath(filename)
+    ok = True
+
+    response = await client.request("initialize", {"capabilities": {}})
+    print("initialize:", response["result"]["serverInfo"]["name"])
+    client.notify("initialized", {})
+
+    with open(filename, "r") as file:
+        text = file.read()
+    client.notify("textDocument/didOpen", {
+        "textDocument": {"uri": uri, "languageId": "python", "version": 1,
+                         "text": text}})
+
+    for params in await client.publications(quiet=1):
+        print("open", _summary(params))
+
+    # Characters are counted in UTF-16 code units, like editors do.
+    line = TYPED_LINE
+    column = len(text.splitlines()[line].encode("utf-16-le")) // 2
+    version = 1
+
+    for char in TYPED_TEXT:
+        version += 1
+        client.notify("textDocument/didChange", {
+            "textDocument": {"uri": uri, "version": version},
+            "contentChanges": [{
+                "range": {"start": {"line": line, "character": column},
+                          "end": {"line": line, "character": column}},
+                "text": char}]})
+
+        if char == "\n":
+            line, column = line + 1, 0
+        else:
+            column += 1
+        await asyncio.sleep(interval)
+
+    published = await client.publications(quiet=1)
+    for params in published:
+        print("typed", _summary(params))
+
+    # Edits in a burst are analysed once, and only the last version.
+    if not published or {params["version"] for params in published} \
+            != {version}:
+        print("FAILED: expected only diagnostics of version", version)
+        ok = False
+
+    # The edited function comes first, the rest of the file after it.
+    elif not any(diagnostic["code"] == "KeyError"
+                 and diagnostic["range"]["start"]["line"] == line
+                 for diagnostic in published[0]["diagnostics"]):
+        print("FAILED: expected the edited function first")
+        ok = False
+
+    await client.request("shutdown")
+    client.notify("exit")
+    await process.wait()
+    await client.reader
+
+    print("exit:", process.returncode)
+    return ok and process.returncode == 0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Runs the language server against a scripted editor "
+                    "that types a line in a file, and checks the "
+                    "diagnostics it publishes.")
+    parser.add_argument("file",
+                        nargs="?",
+                        default=TEST_FILE,
+                        help="Python file to edit (default: tests/test.py)")
+    parser.add_argument("--debounce",
+                        type=float,
+                        default=0.3,
+                        help="debounce of the server, in seconds")
+    parser.add_argument("--interval",
+                        type=float,
+                        default=0.02,
+                        help="seconds between typed characters")
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run_script(args.file, args.debounce,
+                                         args.interval))
+             else 1)
+
+
+if __name__ == "__main__":
+    main()